@@ -1,17 +1,17 @@
 import streamlit as st
-import pandas as pd
-import re
-import subprocess
-import os
+import streamlit.components.v1 as components
 from datetime import datetime
 from streamlit_ace import st_ace
-from pymongo import MongoClient
-import time
+from catalog import load_catalog, filter_qids, count_pages, page_slice, SORT_COLUMNS
+from judge_queue import run_test_case
+from submissions import ensure_indexes, fetch_user_submissions, store_submission_data
+import leaderboard
+import similarity
+from recommender import fetch_recommendations
 
-# MongoDB connection setup
-client = MongoClient('mongodb://localhost:27017/')  # Replace with your MongoDB URI
-db = client['DSA_code_app_db']  # Database name
-collection = db['submissions']  # Collection name
+# Question list paging and the base URL of this app used for question links
+PAGE_SIZES = [25, 50, 100]
+QUESTION_URL = "http://localhost:8503/"
 
 # Streamlit app setup
 st.set_page_config(page_title="DSA Practice", page_icon="🧩", layout="wide")  # Using wide layout
@@ -19,50 +19,38 @@ st.set_page_config(page_title="DSA Practice", page_icon="🧩", layout="wide")
 # Display the question list when no specific question is selected
 st.header("📋 Question List")
 
-# Path for the CSV files where the question data is stored
-QUESTIONS_FILE = "question_details.csv"
+# Load the compiled question catalog once per server process
+@st.cache_resource
+def get_catalog():
+    return load_catalog()
 
-# Read question details from the CSV file
-questions_df = pd.read_csv(QUESTIONS_FILE)
-
-# Ensure the topics column is properly formatted
-questions_df["topics"] = questions_df["topics"].fillna("[]")  # Handle null values
-questions_df["topics"] = questions_df["topics"].apply(
-    lambda x: x.strip("[]").replace("'", "").replace('"', "").split(",")
-)
-
-# Add a new column for 'Status' if not already present and set the initial value to 'Pending'
-if 'Status' not in questions_df.columns:
-    questions_df['Status'] = 'Pending'
+catalog = get_catalog()
 
 def get_qid(row):
     return row.QID  # Access the QID using dot notation
 
-# Function to fetch user submission data from MongoDB
-def fetch_user_submissions(username):
-    submissions = collection.find({"username": username})
-    submission_data = {entry["qid"]: {"status": entry["status"], "time_taken": entry["time_taken"]}
-                       for entry in submissions}
-    return submission_data
+# Create the submission indexes once per server process
+@st.cache_resource
+def init_submission_indexes():
+    ensure_indexes()
+    leaderboard.ensure_indexes()
+    similarity.ensure_indexes()
+
+init_submission_indexes()
 
-def clean_html(raw_html):
-    """Remove HTML tags and decode HTML entities."""
-    html_entities = {"&nbsp;": " ", "&quot;": '"', "&gt;": ">", "&lt;": "<", "&amp;": "&"}
-    for entity, replacement in html_entities.items():
-        raw_html = raw_html.replace(entity, replacement)
-    cleanr = re.compile('<.*?>')
-    return re.sub(cleanr, '', raw_html)
+def get_user_submissions(username):
+    """Return the user's submissions, cached in the session until this user writes."""
+    if st.session_state.get('submissions_user') != username or 'submissions' not in st.session_state:
+        st.session_state['submissions'] = fetch_user_submissions(username)
+        st.session_state['submissions_user'] = username
+    return st.session_state['submissions']
 
-def extract_test_cases(description):
-    """Extract input/output test cases from the question description."""
-    test_cases = []
-    input_pattern = re.compile(r'Input:\s*(.+?)\n', re.IGNORECASE)
-    output_pattern = re.compile(r'Output:\s*(.+?)\n', re.IGNORECASE)
-    inputs = input_pattern.findall(description)
-    outputs = output_pattern.findall(description)
-    for i in range(min(len(inputs), len(outputs))):
-        test_cases.append({"input": inputs[i].strip(), "output": outputs[i].strip()})
-    return test_cases
+def get_recommendations(username):
+    """Return the user's precomputed recommendations, read once per session."""
+    if st.session_state.get('recommendations_user') != username:
+        st.session_state['recommendations'] = fetch_recommendations(username)
+        st.session_state['recommendations_user'] = username
+    return st.session_state['recommendations']
 
 def get_language_structure(language):
     """Return function template for the chosen language."""
@@ -76,79 +64,28 @@ def get_language_structure(language):
         return """#include <iostream>\nusing namespace std;\n\nvoid function_name(<param_types> param1, param2) {\n    // Your code here\n}\n\nint main() {\n    // Call your function here\n    // 1 test case at a time with specifying the input\n    return 0;\n}"""
     return ""
 
+def render_timer(elapsed_seconds):
+    """Show a ticking elapsed-time display that runs in the browser, not in a server loop."""
+    components.html(f"""
+        <div id="timer" style="font-family: sans-serif; font-size: 16px;">Time Elapsed: {format_time(elapsed_seconds)}</div>
+        <script>
+            // Count from the elapsed time at render so client clock skew does not matter
+            const started = Date.now() - {int(elapsed_seconds * 1000)};
+            const pad = (n) => String(n).padStart(2, "0");
+            setInterval(() => {{
+                const total = Math.floor((Date.now() - started) / 1000);
+                const text = pad(Math.floor(total / 3600)) + ":" + pad(Math.floor(total % 3600 / 60)) + ":" + pad(total % 60);
+                document.getElementById("timer").textContent = "Time Elapsed: " + text;
+            }}, 1000);
+        </script>
+    """, height=40)
+
 def format_time(seconds):
     hours = int(seconds // 3600)
     minutes = int((seconds % 3600) // 60)
     seconds = int(seconds % 60)
     return f"{hours:02}:{minutes:02}:{seconds:02}"
 
-def execute_code(language, code, test_case):
-    """Execute code in the chosen language with given test cases."""
-    input_str = test_case['input']
-    output_str = test_case['output']
-    temp_file = None
-    executable = None
-    try:
-        if language == "Python":
-            temp_file = "temp_script.py"
-            with open(temp_file, 'w') as f:
-                f.write(f"{code}\n\nresult = function_name({input_str})\nprint(result)")
-            result = subprocess.run(['python', temp_file], capture_output=True, text=True, timeout=10)
-
-        elif language == "Java":
-            temp_file = "Solution.java"
-            with open(temp_file, 'w') as f:
-                f.write(code)
-            compile_result = subprocess.run(['javac', temp_file], capture_output=True, text=True, timeout=10)
-            if compile_result.returncode != 0:
-                return compile_result.stderr.strip()
-            result = subprocess.run(['java', 'Solution'], capture_output=True, text=True, timeout=10)
-
-        elif language == "C":
-            temp_file = "temp_script.c"
-            executable = "temp_script.exe"  # Updated to Windows-style
-            with open(temp_file, 'w') as f:
-                f.write(code)
-            compile_result = subprocess.run(['gcc', temp_file, '-o', executable], capture_output=True, text=True, timeout=10)
-            if compile_result.returncode != 0:
-                return compile_result.stderr.strip()
-            result = subprocess.run([executable], input=input_str, capture_output=True, text=True, timeout=10)
-
-        elif language == "C++":
-            temp_file = "temp_script.cpp"
-            executable = "temp_script.exe"  # Updated to Windows-style
-            with open(temp_file, 'w') as f:
-                f.write(code)
-            compile_result = subprocess.run(['g++', temp_file, '-o', executable], capture_output=True, text=True, timeout=10)
-            if compile_result.returncode != 0:
-                return compile_result.stderr.strip()
-            result = subprocess.run([executable], input=input_str, capture_output=True, text=True, timeout=10)
-        
-        # Check result
-        actual_output = result.stdout.strip() if result.returncode == 0 else result.stderr.strip()
-        return actual_output
-    finally:
-        # Clean up files
-        if temp_file and os.path.exists(temp_file):
-            os.remove(temp_file)
-        if executable and os.path.exists(executable):
-            os.remove(executable)
-
-def store_submission_data(username, qid, difficulty, cleaned_topics, code_lang, time_taken):
-    """Store user submission data in MongoDB."""
-    submission_data = {
-        "username": username,
-        "qid": qid,
-        "difficulty": difficulty,
-        "topics": cleaned_topics,
-        "coding_lang": code_lang,
-        "time_taken": time_taken,
-        "status": "submitted",  # Mark as submitted
-        "timestamp": datetime.now()  # Store timestamp of submission
-    }
-    collection.insert_one(submission_data)
-    st.success("Data stored successfully!")
-
 # Streamlit interface setup
 query_params = st.query_params  # Replace experimental method
 selected_qid = query_params.get("qid", None)
@@ -166,22 +103,22 @@ if 'username' not in st.session_state:
     st.session_state['username'] = username
    
 if username:
-    st.session_state['submissions'] = fetch_user_submissions(username)
+    user_submissions = get_user_submissions(username)
 
     if selected_qid:
         selected_qid = int(selected_qid)
         # Fetch the question data
-        question_data = questions_df[questions_df['QID'] == selected_qid]
-      
-        if not question_data.empty:
-            description = clean_html(question_data.iloc[0]['Body'])
-            test_cases = extract_test_cases(description)
+        question = catalog["questions"].get(selected_qid)
+
+        if question is not None:
+            # Text is cleaned and parsed when the catalog is compiled
+            test_cases = question['test_cases']
             
             col1, col2 = st.columns([1, 1])
             with col1:
                 st.subheader("Description")
                 st.write("---")
-                st.write(description.split("Example")[0].strip())
+                st.write(question['description'])
                 with st.expander("Test Cases"):
                     for idx, test_case in enumerate(test_cases):
                         st.write(f"*Input:* {test_case['input']}")
@@ -189,13 +126,12 @@ if username:
     
                 st.write("---")
     
-                hints = question_data.iloc[0]['Hints']
-                if hints != '[]':  
-                    hints = hints.strip('[]').replace('"', '').replace("'", "").split(",")
+                hints = question['hints']
+                if hints:
                     with st.expander("Hints"):
                         st.markdown("---")
                         for hint in hints:
-                            st.write(f"{hint.strip()}")
+                            st.write(hint)
     
             with col2:
                 st.subheader("Code")
@@ -209,7 +145,7 @@ if username:
                 else:
                     ace_mode = language.lower()
     
-                description_height = len(description.split("\n")) * 20
+                description_height = question['description_lines'] * 20
                 test_cases_height = len(test_cases) * 40
                 total_height = description_height + test_cases_height
                 editor_height = min(400, total_height)
@@ -231,7 +167,7 @@ if username:
                     if case_button:
                         st.subheader(f"Executing Test Case {idx + 1}")
                         st.write(f"**Input:** {test_case['input']}")
-                        actual_output = execute_code(language, code, test_case)
+                        actual_output = run_test_case(language, code, test_case)
                         st.write(f"**Execution Output:** {actual_output}")
     
                         if actual_output.strip() == test_case['output'].strip():
@@ -243,97 +179,98 @@ if username:
                             st.session_state['test_case_status'][f"case_{idx}"] = None
                             break
     
-                if all(status == "passed" for status in st.session_state['test_case_status'].values()):
+                # A question without extracted test cases has nothing to pass, so it is never accepted
+                statuses = list(st.session_state['test_case_status'].values())
+                if statuses and all(status == "passed" for status in statuses):
                     end_time = datetime.now()
                     time_taken_seconds = (end_time - st.session_state['start_time']).total_seconds()
                     
                     formatted_time_taken = format_time(time_taken_seconds)
                     st.success(f"All test cases passed in {formatted_time_taken}.")
                     
-                    difficulty = question_data.iloc[0]['difficulty']
-                    topics = question_data.iloc[0]['topics']
-                    cleaned_topics = topics if isinstance(topics, list) else []
+                    difficulty = question['difficulty']
+                    cleaned_topics = question['topics']
                     code_lang = language
     
-                    store_submission_data(username, selected_qid, difficulty, cleaned_topics, code_lang, formatted_time_taken)
+                    # Accepted solutions are stored once; later reruns find them in the session cache
+                    if selected_qid not in user_submissions:
+                        is_new = store_submission_data(username, selected_qid, difficulty, cleaned_topics, code_lang,
+                                                       formatted_time_taken, int(time_taken_seconds), code)
+                        if is_new:
+                            leaderboard.record_accepted(username, difficulty, time_taken_seconds)
+                            # Fingerprint for plagiarism review; matches are stored for reviewers, not shown here
+                            similarity.register_submission(username, selected_qid, code_lang, code)
+                        st.session_state.pop('submissions', None)  # Invalidate this user's cached submissions
+                        st.success("Data stored successfully!")
     
                 if 'start_time' in st.session_state:
-                    timer_placeholder = st.sidebar.empty()  # Create an empty placeholder
-
-                    while True:
-                        elapsed_time_seconds = (datetime.now() - st.session_state['start_time']).total_seconds()
-                        formatted_elapsed_time = format_time(elapsed_time_seconds)
-                        timer_placeholder.write(f"Time Elapsed: {formatted_elapsed_time}")
-                        time.sleep(1)  # Update every second
+                    elapsed_time_seconds = (datetime.now() - st.session_state['start_time']).total_seconds()
+                    with st.sidebar:
+                        render_timer(elapsed_time_seconds)
 
     else:
 
+        # Recommended questions are ranked offline by recommender.py; hide any solved since
+        recommended = [qid for qid in get_recommendations(username)
+                       if qid not in user_submissions and qid in catalog["questions"]]
+        if recommended:
+            with st.expander("⭐ Recommended next", expanded=True):
+                for qid in recommended[:5]:
+                    question = catalog["questions"][qid]
+                    st.markdown(f"[{qid}. {question['title']}]({QUESTION_URL}?qid={qid}) "
+                                f"({question['difficulty']}, {', '.join(question['topics'])})")
+
         # Add filters for difficulty and topics
-        difficulty_level = st.selectbox("Filter by Difficulty", options=[""] + list(questions_df["difficulty"].unique()))
-        
-        # Get all unique topics
-        all_topics = []
-        for topics_list in questions_df["topics"]:
-            for topic in topics_list:
-                all_topics.append(topic.strip())
+        difficulty_level = st.selectbox("Filter by Difficulty", options=[""] + catalog["difficulties"])
 
-        unique_topics = [""] + sorted(set(all_topics))  # Sort topics alphabetically
+        unique_topics = [""] + catalog["topics"]  # Sorted alphabetically at compile time
 
         selected_topic = st.selectbox("Filter by Topic", options=unique_topics)
     
-        # Progressive filtering: Apply both filters
-        filtered_questions = questions_df[questions_df["isPaidOnly"] == False] 
-    
-        if difficulty_level:  # Filter by difficulty
-            filtered_questions = filtered_questions[filtered_questions["difficulty"] == difficulty_level]
-    
-        if selected_topic:  # Filter by topic
-            filtered_questions = filtered_questions[filtered_questions["topics"].apply(lambda topics: selected_topic in [topic.strip() for topic in topics])]
+        sort_col, order_col, size_col = st.columns([2, 1, 1])
+        with sort_col:
+            sort_by = st.selectbox("Sort by", options=SORT_COLUMNS)
+        with order_col:
+            descending = st.selectbox("Order", options=["Ascending", "Descending"]) == "Descending"
+        with size_col:
+            page_size = st.selectbox("Questions per page", options=PAGE_SIZES)
+
+        # Filters resolve to set intersections over the catalog indexes, sorting uses precomputed ranks
+        filtered_qids = filter_qids(catalog, difficulty=difficulty_level, topic=selected_topic,
+                                    sort_by=sort_by, descending=descending)
     
         # Check if any rows match the filters
-        if filtered_questions.empty:
+        if not filtered_qids:
             st.warning("No questions match the selected criteria. Please adjust your filters.")
         else:
-            # Display the table headers
-            col1, col2, col3, col4, col5, col6, col7, col8 = st.columns([1, 1, 3, 1, 2, 1, 1, 1])
-    
-            with col1:
-                st.markdown("<b style='color: #1f77b4;'>Index</b>", unsafe_allow_html=True)
-            with col2:
-                st.markdown("<b style='color: #1f77b4;'>QID</b>", unsafe_allow_html=True)
-            with col3:
-                st.markdown("<b style='color: #1f77b4;'>Title</b>", unsafe_allow_html=True)
-            with col4:
-                st.markdown("<b style='color: #1f77b4;'>Difficulty</b>", unsafe_allow_html=True)
-            with col5:
-                st.markdown("<b style='color: #1f77b4;'>Topics</b>", unsafe_allow_html=True)
-            with col6:
-                st.markdown("<b style='color: #1f77b4;'>Status</b>", unsafe_allow_html=True)
-            with col7:
-                st.markdown("<b style='color: #1f77b4;'>Time Taken</b>", unsafe_allow_html=True)
-    
-            # Display filtered results row by row
-            for idx, row in enumerate(filtered_questions.itertuples(), 1):  # Start from index 1
-                col1, col2, col3, col4, col5, col6, col7, col8 = st.columns([1, 1, 3, 1, 2, 1, 1, 1])
-                
-                qid = row.QID
-                submission_info = st.session_state.get('submissions', {}).get(qid, {"status": "Pending", "time_taken": "N/A"})
-    
-                with col1:
-                    st.write(f"**{idx}**")  # Use the continuous index
-                with col2:
-                    st.write(f"**{qid}**")  # QID
-                with col3:
-                    st.write(row.title)  # Title
-                with col4:
-                    st.write(row.difficulty)  # Difficulty
-                with col5:
-                    st.write(", ".join(sorted([topic.strip() for topic in row.topics])))  # Display topics in alphabetical order
-                with col6:
-                    st.write(submission_info["status"])  # Submitted or Pending
-                with col7:
-                    st.write(submission_info["time_taken"])  # Time taken for submission
-                with col8:
-                    # Directly display the clickable URL for the next question
-                    next_url = f"http://localhost:8503/?qid={qid}"
-                    st.markdown(f"[Next Question (QID {qid})]({next_url})")
\ No newline at end of file
+            page_count = count_pages(len(filtered_qids), page_size)
+            page = int(st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1, step=1))
+            page_qids = page_slice(filtered_qids, page, page_size)
+            first_index = (page - 1) * page_size + 1
+
+            # Only the current page is turned into rows, so rendering cost is bounded by the page size
+            rows = []
+            for idx, qid in enumerate(page_qids, first_index):
+                question = catalog["questions"][qid]
+                submission_info = user_submissions.get(qid, {"status": "Pending", "time_taken": "N/A"})
+                rows.append({
+                    "Index": idx,
+                    "QID": qid,
+                    "Title": question['title'],
+                    "Difficulty": question['difficulty'],
+                    "Topics": ", ".join(question['topics']),  # Topics are stored in alphabetical order
+                    "Status": submission_info["status"],  # Submitted or Pending
+                    "Time Taken": submission_info["time_taken"],
+                    "Link": f"{QUESTION_URL}?qid={qid}",
+                })
+
+            st.dataframe(
+                rows,
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "Topics": st.column_config.TextColumn(width="large"),
+                    "Link": st.column_config.LinkColumn("Open", display_text="Solve"),
+                },
+            )
+            st.caption(f"Showing {first_index}-{first_index + len(page_qids) - 1} of {len(filtered_qids)} questions")
@@ -0,0 +1,41 @@
+import streamlit as st
+from leaderboard import top_k, my_rank
+from submissions import client
+
+st.header("🏆 DSA Leaderboard")
+
+# Scope filters come from the student profiles of the placement portal
+students = client['studentDB']['students']
+
+@st.cache_data(ttl=300)
+def get_scopes():
+    return sorted(c for c in students.distinct("college") if c), sorted(d for d in students.distinct("department") if d)
+
+colleges, departments = get_scopes()
+col1, col2, col3 = st.columns([2, 2, 1])
+with col1:
+    college = st.selectbox("College", options=[""] + colleges)
+with col2:
+    department = st.selectbox("Department", options=[""] + departments)
+with col3:
+    k = st.selectbox("Show top", options=[10, 25, 50, 100])
+
+rows = [
+    {"Rank": rank, "Username": entry["username"], "Solved": entry["solved"], "Score": entry["score"],
+     "Total Time (s)": entry["total_time"], "College": entry.get("college"), "Department": entry.get("department")}
+    for rank, entry in enumerate(top_k(k, college=college, department=department), 1)
+]
+if rows:
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+else:
+    st.warning("No accepted submissions yet for this selection.")
+
+username = st.text_input("Find my rank (username)")
+if username:
+    rank, entry = my_rank(username, college=college, department=department)
+    if entry is None:
+        st.info("No accepted submissions found for this user.")
+    elif rank is None:
+        st.info(f"{username} is not in the selected college/department.")
+    else:
+        st.success(f"{username} is ranked #{rank} with {entry['solved']} solved (score {entry['score']}).")
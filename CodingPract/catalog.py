@@ -0,0 +1,162 @@
+import os
+import pickle
+import re
+from collections import defaultdict
+
+import pandas as pd
+
+# Path for the CSV files where the question data is stored
+QUESTIONS_FILE = "question_details.csv"
+# Compiled artifact built from QUESTIONS_FILE, rebuilt whenever the CSV changes
+CATALOG_FILE = "question_catalog.pkl"
+CATALOG_VERSION = 3
+
+# Columns the question list can be sorted by, ranked once at compile time
+SORT_COLUMNS = ["QID", "Title", "Difficulty"]
+DIFFICULTY_ORDER = {"Easy": 0, "Medium": 1, "Hard": 2}
+
+HTML_ENTITIES = {"&nbsp;": " ", "&quot;": '"', "&gt;": ">", "&lt;": "<", "&amp;": "&"}
+TAG_PATTERN = re.compile('<.*?>')
+INPUT_PATTERN = re.compile(r'Input:\s*(.+?)\n', re.IGNORECASE)
+OUTPUT_PATTERN = re.compile(r'Output:\s*(.+?)\n', re.IGNORECASE)
+
+
+def parse_list_field(value):
+    """Turn a stringified list such as "['Array', 'Hash Table']" into a clean list."""
+    if not isinstance(value, str):
+        return []
+    items = value.strip("[]").replace("'", "").replace('"', "").split(",")
+    return [item.strip() for item in items if item.strip()]
+
+
+def clean_html(raw_html):
+    """Remove HTML tags and decode HTML entities."""
+    for entity, replacement in HTML_ENTITIES.items():
+        raw_html = raw_html.replace(entity, replacement)
+    return TAG_PATTERN.sub('', raw_html)
+
+
+def extract_test_cases(description):
+    """Extract input/output test cases from the question description."""
+    inputs = INPUT_PATTERN.findall(description)
+    outputs = OUTPUT_PATTERN.findall(description)
+    return [{"input": inputs[i].strip(), "output": outputs[i].strip()}
+            for i in range(min(len(inputs), len(outputs)))]
+
+
+def prepare_question_text(body, hints):
+    """Precompute everything the question page renders from the raw Body and Hints."""
+    description = clean_html(body if isinstance(body, str) else "")
+    sections = description.split("Example")
+    return {
+        "description": sections[0].strip(),
+        "examples": [f"Example{section}".strip() for section in sections[1:]],
+        "test_cases": extract_test_cases(description),
+        "hints": parse_list_field(hints),
+        "description_lines": len(description.split("\n")),
+    }
+
+
+def _is_true(value):
+    return str(value).strip().lower() == "true"
+
+
+def build_catalog(questions_file=QUESTIONS_FILE):
+    """Read the question CSV once and build the lookup structures used by the app."""
+    questions_df = pd.read_csv(questions_file)
+
+    order = []
+    questions = {}
+    topic_index = defaultdict(set)
+    difficulty_index = defaultdict(set)
+    free_qids = set()
+
+    for row in questions_df.itertuples(index=False):
+        qid = int(row.QID)
+        topics = sorted(set(parse_list_field(row.topics)))
+        is_paid_only = _is_true(row.isPaidOnly)
+        order.append(qid)
+        questions[qid] = {
+            "qid": qid,
+            "title": row.title,
+            "difficulty": row.difficulty,
+            "topics": topics,
+            "is_paid_only": is_paid_only,
+            **prepare_question_text(row.Body, row.Hints),
+        }
+        for topic in topics:
+            topic_index[topic].add(qid)
+        difficulty_index[row.difficulty].add(qid)
+        if not is_paid_only:
+            free_qids.add(qid)
+
+    sort_keys = {
+        "QID": lambda qid: qid,
+        "Title": lambda qid: (str(questions[qid]["title"]).lower(), qid),
+        "Difficulty": lambda qid: (DIFFICULTY_ORDER.get(questions[qid]["difficulty"], len(DIFFICULTY_ORDER)), qid),
+    }
+    sort_ranks = {}
+    for column in SORT_COLUMNS:
+        sort_ranks[column] = {qid: rank for rank, qid in enumerate(sorted(order, key=sort_keys[column]))}
+
+    return {
+        "version": CATALOG_VERSION,
+        "source_mtime": os.path.getmtime(questions_file),
+        "order": order,
+        "sort_ranks": sort_ranks,
+        "questions": questions,
+        "topics": sorted(topic_index),
+        "difficulties": list(dict.fromkeys(questions[qid]["difficulty"] for qid in order)),
+        "topic_index": {topic: frozenset(qids) for topic, qids in topic_index.items()},
+        "difficulty_index": {level: frozenset(qids) for level, qids in difficulty_index.items()},
+        "free_qids": frozenset(free_qids),
+        "all_qids": frozenset(order),
+    }
+
+
+def compile_catalog(questions_file=QUESTIONS_FILE, catalog_file=CATALOG_FILE):
+    """Build the catalog and write it to disk atomically."""
+    catalog = build_catalog(questions_file)
+    temp_file = f"{catalog_file}.{os.getpid()}.tmp"
+    with open(temp_file, "wb") as f:
+        pickle.dump(catalog, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_file, catalog_file)
+    return catalog
+
+
+def load_catalog(questions_file=QUESTIONS_FILE, catalog_file=CATALOG_FILE):
+    """Load the compiled catalog, recompiling it if it is missing or out of date."""
+    if os.path.exists(catalog_file):
+        with open(catalog_file, "rb") as f:
+            catalog = pickle.load(f)
+        if (catalog.get("version") == CATALOG_VERSION
+                and catalog.get("source_mtime") == os.path.getmtime(questions_file)):
+            return catalog
+    return compile_catalog(questions_file, catalog_file)
+
+
+def filter_qids(catalog, difficulty=None, topic=None, free_only=True, sort_by="QID", descending=False):
+    """Return the QIDs matching every given filter, ordered by a precomputed sort column."""
+    matches = catalog["free_qids"] if free_only else catalog["all_qids"]
+    if difficulty:
+        matches = matches & catalog["difficulty_index"].get(difficulty, frozenset())
+    if topic:
+        matches = matches & catalog["topic_index"].get(topic, frozenset())
+    return sorted(matches, key=catalog["sort_ranks"][sort_by].__getitem__, reverse=descending)
+
+
+def count_pages(total, page_size):
+    """Number of pages needed to show total rows, never less than one."""
+    return max(1, -(-total // page_size))
+
+
+def page_slice(qids, page, page_size):
+    """Return the QIDs on a 1-based page, clamped to the available pages."""
+    page = min(max(page, 1), count_pages(len(qids), page_size))
+    start = (page - 1) * page_size
+    return qids[start:start + page_size]
+
+
+if __name__ == "__main__":
+    compiled = compile_catalog()
+    print(f"Compiled {len(compiled['order'])} questions and {len(compiled['topics'])} topics into {CATALOG_FILE}")
@@ -0,0 +1,27 @@
+import pandas as pd
+import plotly.express as px
+
+
+def build_figures(stats):
+    """Build every dashboard figure once from the aggregated submission counts."""
+    date_counts = pd.DataFrame(stats["dates"], columns=['Date', 'Submission Count'])
+    difficulty_counts = pd.DataFrame(stats["difficulties"], columns=['Difficulty', 'Count'])
+    topic_counts = pd.DataFrame(stats["topics"], columns=['Topic', 'Count'])
+    coding_lang_counts = pd.DataFrame(stats["languages"], columns=['Coding Language', 'Count'])
+
+    # Use line chart instead of bar chart for date-wise submissions
+    submission_date_chart = px.line(date_counts, x="Date", y="Submission Count",
+                                    title="Submissions Date-wise", markers=True)
+    submission_date_chart.update_layout(xaxis_tickangle=45)
+
+    topic_bar_chart = px.bar(topic_counts, x="Topic", y="Count", title="Topic-wise Submissions")
+    topic_bar_chart.update_layout(xaxis_tickangle=0)  # Horizontal x-axis labels
+
+    return {
+        "submission_date_graph": submission_date_chart,
+        "difficulty_pie_chart": px.pie(difficulty_counts, names='Difficulty', values='Count',
+                                       title='Difficulty-wise Submissions'),
+        "topic_bar_chart": topic_bar_chart,
+        "coding_lang_pie_chart": px.pie(coding_lang_counts, names='Coding Language', values='Count',
+                                        title='Coding Language Used'),
+    }
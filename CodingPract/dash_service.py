@@ -0,0 +1,62 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+import dash
+from dash import dcc, html, Input, Output
+
+from dash_figures import build_figures
+from submissions import submission_stats
+
+# Long-lived dashboard service, started once with `python dash_service.py`
+DASH_PORT = int(os.getenv("DASH_PORT", "8051"))
+FIGURE_CACHE_TTL = 60  # seconds a user's figures are reused before re-aggregating
+FIGURE_CACHE_SIZE = 256  # users whose figures are kept; least recently used are evicted
+
+_figure_cache = OrderedDict()  # username -> (built at, figures), least recently used first
+_figure_cache_lock = threading.Lock()
+
+
+def get_user_figures(username):
+    """Return the user's figures, rebuilding them at most once per FIGURE_CACHE_TTL."""
+    now = time.monotonic()
+    with _figure_cache_lock:
+        cached = _figure_cache.get(username)
+        if cached and now - cached[0] < FIGURE_CACHE_TTL:
+            _figure_cache.move_to_end(username)
+            return cached[1]
+    figures = build_figures(submission_stats(username))
+    with _figure_cache_lock:
+        _figure_cache[username] = (now, figures)
+        _figure_cache.move_to_end(username)
+        # Drop expired entries from the cold end, then enforce the size bound
+        while _figure_cache and (now - next(iter(_figure_cache.values()))[0] >= FIGURE_CACHE_TTL
+                                 or len(_figure_cache) > FIGURE_CACHE_SIZE):
+            _figure_cache.popitem(last=False)
+    return figures
+
+
+app = dash.Dash(__name__)
+
+# The username is passed in the URL, e.g. http://localhost:8051/?username=alice
+app.layout = html.Div([
+    dcc.Location(id="url"),
+    html.Div(id="dashboard"),
+])
+
+
+@app.callback(Output("dashboard", "children"), Input("url", "search"))
+def render_dashboard(search):
+    username = parse_qs((search or "").lstrip("?")).get("username", [""])[0]
+    if not username:
+        return html.H1("Add ?username=<name> to the URL to view a dashboard")
+    figures = get_user_figures(username)
+    return [html.H1(f"Dashboard for {username}")] + [
+        dcc.Graph(id=graph_id, figure=figure) for graph_id, figure in figures.items()
+    ]
+
+
+if __name__ == "__main__":
+    app.run(debug=False, port=DASH_PORT)
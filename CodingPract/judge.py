@@ -0,0 +1,53 @@
+import os
+import subprocess
+import tempfile
+
+# Per-step limit for compiling and running a submission (seconds)
+EXECUTION_TIMEOUT = 10
+# Programs may print arbitrary bytes; undecodable output must not crash the judge
+OUTPUT_ENCODING = {"encoding": "utf-8", "errors": "replace"}
+
+
+def execute_code(language, code, test_case):
+    """Execute code in the chosen language with given test cases."""
+    input_str = test_case['input']
+    # Every run gets its own scratch directory so concurrent judges never
+    # overwrite each other's source files or executables.
+    with tempfile.TemporaryDirectory(prefix="judge_") as work_dir:
+        if language == "Python":
+            temp_file = os.path.join(work_dir, "temp_script.py")
+            with open(temp_file, 'w') as f:
+                f.write(f"{code}\n\nresult = function_name({input_str})\nprint(result)")
+            result = subprocess.run(['python', temp_file], capture_output=True, **OUTPUT_ENCODING,
+                                    timeout=EXECUTION_TIMEOUT)
+
+        elif language == "Java":
+            temp_file = os.path.join(work_dir, "Solution.java")
+            with open(temp_file, 'w') as f:
+                f.write(code)
+            compile_result = subprocess.run(['javac', temp_file], capture_output=True, **OUTPUT_ENCODING,
+                                            timeout=EXECUTION_TIMEOUT)
+            if compile_result.returncode != 0:
+                return compile_result.stderr.strip()
+            result = subprocess.run(['java', '-cp', work_dir, 'Solution'], capture_output=True, **OUTPUT_ENCODING,
+                                    timeout=EXECUTION_TIMEOUT)
+
+        elif language in ("C", "C++"):
+            source_name, compiler = ("temp_script.c", "gcc") if language == "C" else ("temp_script.cpp", "g++")
+            temp_file = os.path.join(work_dir, source_name)
+            executable = os.path.join(work_dir, "temp_script.exe")  # Updated to Windows-style
+            with open(temp_file, 'w') as f:
+                f.write(code)
+            compile_result = subprocess.run([compiler, temp_file, '-o', executable], capture_output=True, **OUTPUT_ENCODING,
+                                            timeout=EXECUTION_TIMEOUT)
+            if compile_result.returncode != 0:
+                return compile_result.stderr.strip()
+            result = subprocess.run([executable], input=input_str, capture_output=True, **OUTPUT_ENCODING,
+                                    timeout=EXECUTION_TIMEOUT)
+
+        else:
+            return f"Unsupported language: {language}"
+
+        # Check result
+        actual_output = result.stdout.strip() if result.returncode == 0 else result.stderr.strip()
+        return actual_output
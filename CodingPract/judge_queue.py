@@ -0,0 +1,162 @@
+import argparse
+import os
+import socket
+import subprocess
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient, ReturnDocument, ASCENDING
+
+from judge import execute_code, EXECUTION_TIMEOUT
+
+# ---------------------------
+# Configuration
+# ---------------------------
+# "local" runs submissions in the Streamlit process, "queue" hands them to judge workers.
+JUDGE_MODE = os.getenv("JUDGE_MODE", "local")
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
+
+# A claimed job is owned by its worker until the lease expires. The lease must outlive
+# the worst case of compile + run (two timed subprocess calls) with some headroom.
+LEASE_SECONDS = 4 * EXECUTION_TIMEOUT
+MAX_ATTEMPTS = 3
+POLL_INTERVAL = 0.2
+RESULT_TIMEOUT = MAX_ATTEMPTS * LEASE_SECONDS
+FINISHED_JOB_TTL = 24 * 3600
+
+client = MongoClient(MONGO_URI)
+db = client['DSA_code_app_db']
+jobs = db['judge_jobs']
+
+
+def ensure_indexes():
+    """Create the indexes used by claim and cleanup queries."""
+    jobs.create_index([("status", ASCENDING), ("lease_expires_at", ASCENDING), ("created_at", ASCENDING)])
+    jobs.create_index("finished_at", expireAfterSeconds=FINISHED_JOB_TTL)
+
+
+def _judge(language, code, test_case):
+    """Run one test case, turning a timeout into a verdict instead of an exception."""
+    try:
+        return execute_code(language, code, test_case)
+    except subprocess.TimeoutExpired:
+        return "Time Limit Exceeded"
+    except Exception as e:
+        # A bad submission or a missing compiler is a verdict, never a dead worker
+        return f"Judge error: {type(e).__name__}: {e}"
+
+
+# ---------------------------
+# Producer side (DSA_app_db)
+# ---------------------------
+def enqueue_job(language, code, test_case):
+    """Add a judge job to the queue and return its id."""
+    now = datetime.utcnow()
+    job = {
+        "_id": uuid.uuid4().hex,
+        "status": "queued",
+        "language": language,
+        "code": code,
+        "test_case": test_case,
+        "attempts": 0,
+        "worker_id": None,
+        "lease_expires_at": None,
+        "result": None,
+        "created_at": now,
+    }
+    jobs.insert_one(job)
+    return job["_id"]
+
+
+def wait_for_result(job_id, timeout=RESULT_TIMEOUT):
+    """Poll until a worker has written the result back for job_id."""
+    deadline = time.monotonic() + timeout
+    delay = POLL_INTERVAL
+    while time.monotonic() < deadline:
+        job = jobs.find_one({"_id": job_id}, {"status": 1, "result": 1})
+        if job is None:
+            return "Judge job disappeared from the queue"
+        if job["status"] in ("done", "failed"):
+            return job["result"]
+        time.sleep(delay)
+        delay = min(delay * 2, 2.0)
+    # Nobody is waiting any more: cancel so workers skip it and the TTL index removes it
+    jobs.update_one({"_id": job_id, "status": {"$in": ["queued", "running"]}},
+                    {"$set": {"status": "cancelled", "finished_at": datetime.utcnow()}})
+    return "Judge timed out, please try again"
+
+
+def run_test_case(language, code, test_case):
+    """Judge a single test case, locally or through the queue depending on JUDGE_MODE."""
+    if JUDGE_MODE == "queue":
+        return wait_for_result(enqueue_job(language, code, test_case))
+    return _judge(language, code, test_case)
+
+
+# ---------------------------
+# Worker side (any number of nodes)
+# ---------------------------
+def claim_job(worker_id):
+    """Atomically take the oldest queued job, or one whose lease has expired (cancelled jobs are never taken)."""
+    now = datetime.utcnow()
+    return jobs.find_one_and_update(
+        {
+            "$or": [
+                {"status": "queued"},
+                {"status": "running", "lease_expires_at": {"$lt": now}},
+            ],
+            "attempts": {"$lt": MAX_ATTEMPTS},
+        },
+        {
+            "$set": {
+                "status": "running",
+                "worker_id": worker_id,
+                "lease_expires_at": now + timedelta(seconds=LEASE_SECONDS),
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("created_at", ASCENDING)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def complete_job(job, worker_id, result):
+    """Write the result back, unless the lease was lost to another worker meanwhile."""
+    outcome = jobs.update_one(
+        {"_id": job["_id"], "status": "running", "worker_id": worker_id},
+        {"$set": {"status": "done", "result": result, "finished_at": datetime.utcnow()}},
+    )
+    return outcome.modified_count == 1
+
+
+def fail_abandoned_jobs():
+    """Give up on jobs whose workers died on every attempt."""
+    jobs.update_many(
+        {"status": "running", "lease_expires_at": {"$lt": datetime.utcnow()}, "attempts": {"$gte": MAX_ATTEMPTS}},
+        {"$set": {"status": "failed",
+                  "result": f"Judge failed after {MAX_ATTEMPTS} attempts",
+                  "finished_at": datetime.utcnow()}},
+    )
+
+
+def run_worker(worker_id, idle_sleep=0.5):
+    """Claim and execute jobs until interrupted."""
+    ensure_indexes()
+    print(f"Judge worker {worker_id} started")
+    while True:
+        fail_abandoned_jobs()
+        job = claim_job(worker_id)
+        if job is None:
+            time.sleep(idle_sleep)
+            continue
+        result = _judge(job["language"], job["code"], job["test_case"])
+        if not complete_job(job, worker_id, result):
+            print(f"Lease lost or job cancelled for {job['_id']}, result discarded")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stateless DSA judge worker")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}")
+    args = parser.parse_args()
+    run_worker(args.worker_id)
@@ -0,0 +1,188 @@
+import argparse
+
+from pymongo import ASCENDING, DESCENDING, ReplaceOne, ReturnDocument, UpdateOne
+
+from submissions import client, db, collection
+
+# One score document per user, updated as solutions are accepted
+leaderboard = db['leaderboard']
+# Users per (scope, score), kept in step with the leaderboard so "users ahead" is a sum over distinct scores
+score_buckets = db['leaderboard_score_buckets']
+# Student profiles written by the Node.js portal (college, department)
+students = client['studentDB']['students']
+
+DIFFICULTY_WEIGHTS = {"Easy": 1, "Medium": 2, "Hard": 3}
+RANK_ORDER = [("score", DESCENDING), ("total_time", ASCENDING)]
+
+
+def ensure_indexes():
+    """Create one ranking index per scope so top-K and rank counts stay on the index (and seed score buckets)."""
+    leaderboard.create_index([("score", DESCENDING), ("total_time", ASCENDING)])
+    leaderboard.create_index([("college", ASCENDING), ("score", DESCENDING), ("total_time", ASCENDING)])
+    leaderboard.create_index([("college", ASCENDING), ("department", ASCENDING),
+                              ("score", DESCENDING), ("total_time", ASCENDING)])
+    leaderboard.create_index([("department", ASCENDING), ("score", DESCENDING), ("total_time", ASCENDING)])
+    score_buckets.create_index([("scope", ASCENDING), ("score", DESCENDING)], unique=True)
+    if score_buckets.estimated_document_count() == 0 and leaderboard.estimated_document_count() > 0:
+        # Leaderboards built before the buckets existed
+        rebuild_score_buckets()
+
+
+def _scope(college=None, department=None):
+    scope = {}
+    if college:
+        scope["college"] = college
+    if department:
+        scope["department"] = department
+    return scope
+
+
+def _scope_keys(college, department):
+    """Every leaderboard scope a user with this profile belongs to."""
+    keys = ["all"]
+    if college:
+        keys.append(f"college:{college}")
+    if department:
+        keys.append(f"department:{department}")
+    if college and department:
+        keys.append(f"college:{college}|department:{department}")
+    return keys
+
+
+def _scope_key(college=None, department=None):
+    return _scope_keys(college, department)[-1]
+
+
+def _bucket_updates(entry, delta):
+    """Count (delta=1) or uncount (delta=-1) a leaderboard entry in its scopes' score buckets."""
+    return [UpdateOne({"scope": key, "score": entry["score"]}, {"$inc": {"count": delta}}, upsert=True)
+            for key in _scope_keys(entry.get("college"), entry.get("department"))]
+
+
+def _student_profile(username):
+    profile = students.find_one({"username": username}, {"_id": 0, "college": 1, "department": 1}) or {}
+    return {"college": profile.get("college"), "department": profile.get("department")}
+
+
+def record_accepted(username, difficulty, time_taken_seconds):
+    """Add a newly accepted question to the user's score and move them to their new score bucket."""
+    weight = DIFFICULTY_WEIGHTS.get(difficulty, 1)
+    after = leaderboard.find_one_and_update(
+        {"_id": username},
+        {
+            "$inc": {"solved": 1, "score": weight, "total_time": int(time_taken_seconds)},
+            "$setOnInsert": {"username": username, **_student_profile(username)},
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    updates = _bucket_updates(after, 1)
+    if after["solved"] > 1:
+        updates += _bucket_updates({**after, "score": after["score"] - weight}, -1)
+    score_buckets.bulk_write(updates, ordered=False)
+
+
+def top_k(k=10, college=None, department=None):
+    """Return the k best users, globally or within a college/department."""
+    return list(leaderboard.find(_scope(college, department)).sort(RANK_ORDER).limit(k))
+
+
+def my_rank(username, college=None, department=None):
+    """Return (rank, score document) for a user within the scope.
+
+    (None, None) if they have not solved anything, (None, entry) if they are outside the college/department.
+    """
+    entry = leaderboard.find_one({"_id": username})
+    if entry is None:
+        return None, None
+    scope = _scope(college, department)
+    if any(entry.get(field) != value for field, value in scope.items()):
+        return None, entry
+    # Higher scores: one bucket per distinct score above theirs, not one key per user ahead
+    higher = next(score_buckets.aggregate([
+        {"$match": {"scope": _scope_key(college, department), "score": {"$gt": entry["score"]}}},
+        {"$group": {"_id": None, "count": {"$sum": "$count"}}},
+    ]), {"count": 0})["count"]
+    # Ties on score are broken by time; this walks only the users sharing their score
+    faster = leaderboard.count_documents({**scope, "score": entry["score"],
+                                          "total_time": {"$lt": entry["total_time"]}})
+    return higher + faster + 1, entry
+
+
+def _seconds_expression():
+    """Time taken in seconds, parsing the older HH:MM:SS strings when the number is missing."""
+    parts = {"$split": ["$time_taken", ":"]}
+    return {"$ifNull": ["$time_taken_seconds", {"$let": {"vars": {"p": parts}, "in": {"$add": [
+        {"$multiply": [{"$toInt": {"$arrayElemAt": ["$$p", 0]}}, 3600]},
+        {"$multiply": [{"$toInt": {"$arrayElemAt": ["$$p", 1]}}, 60]},
+        {"$toInt": {"$arrayElemAt": ["$$p", 2]}},
+    ]}}}]}
+
+
+def rebuild_leaderboard(batch_size=1000):
+    """Recompute every score document from the full submission history."""
+    weight = {"$switch": {
+        "branches": [{"case": {"$eq": ["$difficulty", level]}, "then": w} for level, w in DIFFICULTY_WEIGHTS.items()],
+        "default": 1,
+    }}
+    totals = collection.aggregate([
+        {"$match": {"status": "submitted"}},
+        {"$group": {"_id": "$username",
+                    "solved": {"$sum": 1},
+                    "score": {"$sum": weight},
+                    "total_time": {"$sum": _seconds_expression()}}},
+    ], allowDiskUse=True)
+
+    seen = set()
+    batch = []
+
+    def flush():
+        usernames = [entry["_id"] for entry in batch]
+        profiles = {p["username"]: p for p in students.find({"username": {"$in": usernames}},
+                                                            {"_id": 0, "username": 1, "college": 1, "department": 1})}
+        leaderboard.bulk_write([
+            ReplaceOne({"_id": entry["_id"]}, {
+                "username": entry["_id"],
+                "solved": entry["solved"],
+                "score": entry["score"],
+                "total_time": entry["total_time"],
+                "college": profiles.get(entry["_id"], {}).get("college"),
+                "department": profiles.get(entry["_id"], {}).get("department"),
+            }, upsert=True)
+            for entry in batch
+        ])
+        batch.clear()
+
+    for entry in totals:
+        seen.add(entry["_id"])
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    leaderboard.delete_many({"_id": {"$nin": list(seen)}})
+    rebuild_score_buckets()
+    ensure_indexes()
+    return len(seen)
+
+
+def rebuild_score_buckets():
+    """Recount the per-scope score buckets from the leaderboard documents."""
+    counts = {}
+    for entry in leaderboard.find({}, {"score": 1, "college": 1, "department": 1}):
+        for key in _scope_keys(entry.get("college"), entry.get("department")):
+            counts[(key, entry["score"])] = counts.get((key, entry["score"]), 0) + 1
+    score_buckets.delete_many({})
+    if counts:
+        score_buckets.insert_many([{"scope": key, "score": score, "count": count}
+                                   for (key, score), count in counts.items()])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DSA leaderboard maintenance")
+    parser.add_argument("--rebuild", action="store_true", help="recompute all scores from submission history")
+    args = parser.parse_args()
+    if args.rebuild:
+        print(f"Rebuilt leaderboard for {rebuild_leaderboard()} users")
+    else:
+        ensure_indexes()
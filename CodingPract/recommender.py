@@ -0,0 +1,119 @@
+import argparse
+from datetime import datetime
+
+import numpy as np
+from scipy import sparse
+from pymongo import UpdateOne
+
+from catalog import load_catalog
+from leaderboard import DIFFICULTY_WEIGHTS
+from submissions import db, collection
+
+# Precomputed "recommended next" lists, one document per user
+recommendations = db['recommendations']
+
+RECOMMENDATIONS_PER_USER = 10
+USER_BATCH_SIZE = 512
+# Solving a question within this many seconds counts as full mastery of its topics
+TARGET_SOLVE_SECONDS = 30 * 60
+
+
+def _parse_seconds(entry):
+    if entry.get("time_taken_seconds") is not None:
+        return entry["time_taken_seconds"]
+    try:
+        hours, minutes, seconds = (int(part) for part in str(entry.get("time_taken", "")).split(":"))
+        return hours * 3600 + minutes * 60 + seconds
+    except ValueError:
+        return TARGET_SOLVE_SECONDS
+
+
+def build_topic_question_matrix(catalog):
+    """Sparse topics x free-questions matrix, each question's topics weighted to sum to one."""
+    topic_ids = {topic: i for i, topic in enumerate(catalog["topics"])}
+    qids = [qid for qid in catalog["order"] if qid in catalog["free_qids"]]
+    rows, cols, values = [], [], []
+    for col, qid in enumerate(qids):
+        topics = catalog["questions"][qid]["topics"]
+        for topic in topics:
+            rows.append(topic_ids[topic])
+            cols.append(col)
+            values.append(1.0 / len(topics))
+    matrix = sparse.csr_matrix((values, (rows, cols)), shape=(len(topic_ids), len(qids)))
+    return matrix, topic_ids, qids
+
+
+def build_user_matrices(catalog, topic_ids, qids):
+    """Sparse users x topics mastery and users x questions solved matrices from all submissions."""
+    qid_cols = {qid: col for col, qid in enumerate(qids)}
+    user_ids = {}
+    m_rows, m_cols, m_values = [], [], []
+    s_rows, s_cols = [], []
+    projection = {"_id": 0, "username": 1, "qid": 1, "difficulty": 1, "time_taken": 1, "time_taken_seconds": 1}
+    for entry in collection.find({"status": "submitted"}, projection):
+        question = catalog["questions"].get(entry["qid"])
+        if question is None:
+            continue
+        user = user_ids.setdefault(entry["username"], len(user_ids))
+        # Harder questions and faster solves count for more mastery
+        speed = min(1.0, TARGET_SOLVE_SECONDS / max(_parse_seconds(entry), 1))
+        weight = DIFFICULTY_WEIGHTS.get(question["difficulty"], 1) * (0.5 + 0.5 * speed)
+        for topic in question["topics"]:
+            m_rows.append(user)
+            m_cols.append(topic_ids[topic])
+            m_values.append(weight)
+        if entry["qid"] in qid_cols:
+            s_rows.append(user)
+            s_cols.append(qid_cols[entry["qid"]])
+    mastery = sparse.csr_matrix((m_values, (m_rows, m_cols)), shape=(len(user_ids), len(topic_ids)))
+    solved = sparse.csr_matrix((np.ones(len(s_rows)), (s_rows, s_cols)), shape=(len(user_ids), len(qids)))
+    return mastery, solved, list(user_ids)
+
+
+def rank_questions(mastery, solved, topic_question, difficulty_penalty, top_n=RECOMMENDATIONS_PER_USER):
+    """Column indexes and scores of the top_n questions per user, weakest topics first."""
+    # Weakness decays with mastery; duplicate (user, topic) entries were summed by csr_matrix
+    weakness = 1.0 / (1.0 + mastery.toarray())
+    scores = np.asarray((topic_question.T @ weakness.T).T) - difficulty_penalty
+    scores[solved.nonzero()] = -np.inf
+    top_n = min(top_n, scores.shape[1])
+    best = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n]
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    order = best_scores.argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(best, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+
+def precompute_recommendations(batch_size=USER_BATCH_SIZE, top_n=RECOMMENDATIONS_PER_USER):
+    """Rank unsolved questions for every user in batches and store the results."""
+    catalog = load_catalog()
+    topic_question, topic_ids, qids = build_topic_question_matrix(catalog)
+    mastery, solved, usernames = build_user_matrices(catalog, topic_ids, qids)
+    # Prefer easier questions when topic weakness ties
+    difficulty_penalty = 0.01 * np.array([DIFFICULTY_WEIGHTS.get(catalog["questions"][qid]["difficulty"], 1)
+                                          for qid in qids])
+    generated_at = datetime.now()
+    for start in range(0, len(usernames), batch_size):
+        end = min(start + batch_size, len(usernames))
+        best, best_scores = rank_questions(mastery[start:end], solved[start:end], topic_question,
+                                           difficulty_penalty, top_n)
+        recommendations.bulk_write([
+            UpdateOne({"_id": usernames[start + i]},
+                      {"$set": {"qids": [qids[col] for col, score in zip(row, row_scores) if np.isfinite(score)],
+                                "generated_at": generated_at}},
+                      upsert=True)
+            for i, (row, row_scores) in enumerate(zip(best, best_scores))
+        ])
+    return len(usernames)
+
+
+def fetch_recommendations(username):
+    """Return the precomputed recommended QIDs for a user (empty until the batch job has run)."""
+    entry = recommendations.find_one({"_id": username}, {"_id": 0, "qids": 1})
+    return entry["qids"] if entry else []
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute topic-weakness question recommendations")
+    parser.add_argument("--top-n", type=int, default=RECOMMENDATIONS_PER_USER)
+    args = parser.parse_args()
+    print(f"Stored recommendations for {precompute_recommendations(top_n=args.top_n)} users")
@@ -0,0 +1,101 @@
+import hashlib
+import re
+
+from pymongo import ASCENDING
+
+from submissions import db
+
+# Winnowed k-gram fingerprints of accepted code, one document per (username, qid)
+fingerprints = db['code_fingerprints']
+
+KGRAM_SIZE = 5  # tokens per k-gram
+WINDOW_SIZE = 4  # k-grams per winnowing window
+SIMILARITY_THRESHOLD = 0.8  # share of fingerprints that marks a submission as suspicious
+
+# Keywords and builtins of the supported languages stay as-is; every other identifier is anonymised
+KEYWORDS = {
+    "and", "as", "assert", "break", "case", "catch", "char", "class", "const", "continue", "def", "default",
+    "del", "do", "double", "elif", "else", "except", "false", "False", "final", "finally", "float", "for",
+    "from", "if", "import", "in", "int", "is", "lambda", "len", "long", "new", "None", "nonlocal", "not",
+    "null", "or", "pass", "private", "public", "range", "return", "static", "struct", "switch", "this",
+    "throw", "true", "True", "try", "void", "while", "yield", "include", "using", "namespace", "std",
+    "vector", "string", "String", "bool", "boolean", "auto", "unsigned", "sizeof", "print", "printf",
+}
+# String literals are matched before comments in one scan, so "#" or "//" inside a string is not a comment;
+# comments match the "comment" group and are dropped
+TOKEN_PATTERN = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\''
+                           r'|(?P<comment>//[^\n]*|(?s:/\*.*?\*/)|#(?!include)[^\n]*)'
+                           r'|[A-Za-z_]\w*|\d+(?:\.\d+)?|==|!=|<=|>=|&&|\|\||\S')
+
+
+def ensure_indexes():
+    """Multikey index turning the fingerprint arrays into a per-question inverted index."""
+    fingerprints.create_index([("qid", ASCENDING), ("hashes", ASCENDING)])
+
+
+def normalize_tokens(code):
+    """Tokenize code with comments and whitespace dropped and identifiers/literals replaced by placeholders."""
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(code):
+        if match.group("comment"):
+            continue
+        token = match.group()
+        if token[0] in "\"'":
+            tokens.append("S")
+        elif token[0].isdigit():
+            tokens.append("N")
+        elif token[0].isalpha() or token[0] == "_":
+            tokens.append(token if token in KEYWORDS else "V")
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def _kgram_hash(kgram):
+    # Stable across processes, unlike the built-in hash()
+    return int.from_bytes(hashlib.blake2b(" ".join(kgram).encode(), digest_size=8).digest(), "big", signed=True)
+
+
+def fingerprint(code, k=KGRAM_SIZE, window=WINDOW_SIZE):
+    """Winnow the k-gram hashes of the normalized code into a set of fingerprints."""
+    tokens = normalize_tokens(code)
+    hashes = [_kgram_hash(tokens[i:i + k]) for i in range(len(tokens) - k + 1)]
+    if len(hashes) <= window:
+        return set(hashes)
+    selected = set()
+    for start in range(len(hashes) - window + 1):
+        selected.add(min(hashes[start:start + window]))
+    return selected
+
+
+def find_similar(qid, hashes, limit=5, exclude_username=None):
+    """Return the prior submissions of a question sharing the most fingerprints with hashes."""
+    if not hashes:
+        return []
+    hashes = list(hashes)
+    match = {"qid": qid, "hashes": {"$in": hashes}}
+    if exclude_username:
+        match["username"] = {"$ne": exclude_username}
+    candidates = fingerprints.aggregate([
+        {"$match": match},
+        {"$project": {"_id": 0, "username": 1, "language": 1,
+                      "shared": {"$size": {"$setIntersection": ["$hashes", hashes]}}}},
+        {"$sort": {"shared": -1}},
+        {"$limit": limit},
+    ])
+    return [{"username": c["username"], "language": c["language"], "score": c["shared"] / len(hashes)}
+            for c in candidates]
+
+
+def register_submission(username, qid, language, code):
+    """Fingerprint an accepted solution, store it and return its closest prior matches."""
+    hashes = fingerprint(code)
+    matches = find_similar(qid, hashes, exclude_username=username)
+    fingerprints.replace_one(
+        {"_id": f"{username}:{qid}"},
+        {"username": username, "qid": qid, "language": language, "hashes": sorted(hashes),
+         "flagged": bool(matches) and matches[0]["score"] >= SIMILARITY_THRESHOLD,
+         "similar_to": matches},
+        upsert=True,
+    )
+    return matches
@@ -0,0 +1,111 @@
+import os
+import argparse
+from datetime import datetime
+
+from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+# MongoDB connection setup
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
+client = MongoClient(MONGO_URI)
+db = client['DSA_code_app_db']  # Database name
+collection = db['submissions']  # Collection name
+
+# Only the fields the question list needs
+SUMMARY_PROJECTION = {"_id": 0, "qid": 1, "status": 1, "time_taken": 1}
+DUPLICATE_KEY = 11000
+
+
+def ensure_indexes():
+    """Create the submission indexes.
+
+    Never deletes data: if old duplicate records block the unique index, run
+    `python submissions.py --remove-duplicates` once and restart.
+    """
+    try:
+        collection.create_index([("username", ASCENDING), ("qid", ASCENDING)], unique=True)
+    except OperationFailure as e:
+        if e.code != DUPLICATE_KEY:
+            raise
+        raise RuntimeError("Duplicate (username, qid) submissions block the unique index; "
+                           "run `python submissions.py --remove-duplicates` first") from e
+    collection.create_index([("username", ASCENDING), ("timestamp", DESCENDING)])
+
+
+def remove_duplicate_submissions():
+    """Keep only the earliest accepted record per (username, qid)."""
+    duplicates = collection.aggregate([
+        {"$sort": {"timestamp": ASCENDING}},
+        {"$group": {"_id": {"username": "$username", "qid": "$qid"},
+                    "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ], allowDiskUse=True)
+    for group in duplicates:
+        collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+
+
+def fetch_user_submissions(username):
+    """Fetch the status and time taken of every question the user has solved."""
+    submissions = collection.find({"username": username}, SUMMARY_PROJECTION)
+    return {entry["qid"]: {"status": entry["status"], "time_taken": entry["time_taken"]}
+            for entry in submissions}
+
+
+def store_submission_data(username, qid, difficulty, cleaned_topics, code_lang, time_taken, time_taken_seconds=None,
+                          code=None):
+    """Record an accepted solution once per (username, qid); returns True if it was new."""
+    submission_data = {
+        "username": username,
+        "qid": qid,
+        "difficulty": difficulty,
+        "topics": cleaned_topics,
+        "coding_lang": code_lang,
+        "code": code,
+        "time_taken": time_taken,
+        "time_taken_seconds": time_taken_seconds,
+        "status": "submitted",  # Mark as submitted
+        "timestamp": datetime.now()  # Store timestamp of submission
+    }
+    result = collection.update_one(
+        {"username": username, "qid": qid},
+        {"$setOnInsert": submission_data},
+        upsert=True,
+    )
+    return result.upserted_id is not None
+
+
+def submission_stats(username):
+    """Count a user's submissions by date, difficulty, topic and language in one aggregation."""
+    def count_by(field):
+        return [{"$group": {"_id": field, "count": {"$sum": 1}}}, {"$sort": {"_id": ASCENDING}}]
+
+    result = next(collection.aggregate([
+        {"$match": {"username": username}},
+        {"$facet": {
+            "total": [{"$count": "count"}],
+            "dates": count_by({"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}}),
+            "difficulties": count_by("$difficulty"),
+            "topics": [{"$unwind": "$topics"}] + count_by("$topics"),
+            "languages": count_by("$coding_lang"),
+        }},
+    ]), None) or {}
+    total = result.get("total") or [{"count": 0}]
+    return {
+        "total": total[0]["count"],
+        "dates": [(entry["_id"], entry["count"]) for entry in result.get("dates", [])],
+        "difficulties": [(entry["_id"], entry["count"]) for entry in result.get("difficulties", [])],
+        "topics": sorted(((entry["_id"], entry["count"]) for entry in result.get("topics", [])),
+                         key=lambda item: item[1], reverse=True),
+        "languages": [(entry["_id"], entry["count"]) for entry in result.get("languages", [])],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DSA submissions maintenance")
+    parser.add_argument("--remove-duplicates", action="store_true",
+                        help="one-off migration: keep the earliest record per (username, qid), then build the indexes")
+    args = parser.parse_args()
+    if args.remove_duplicates:
+        remove_duplicate_submissions()
+    ensure_indexes()
+    print("Submission indexes are in place")
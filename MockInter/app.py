@@ -2,8 +2,9 @@ import streamlit as st
 import openai
 import time
 import os
+import sys
 import json
-import google.generativeai as genai
+import uuid
 import numpy as np
 import speech_recognition as sr
 import cv2
@@ -17,14 +18,21 @@ from PIL import Image as PILImage
 # Environment and API Configuration
 # ---------------------------
 load_dotenv()
-genai.configure(api_key=os.getenv('API_KEY'))
+# Model calls go through the shared gateway (it reads API_KEY and the LLM_* settings)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+import llm_gateway
+llm_gateway.configure_logging()
+from question_bank import get_question_set, ensure_indexes as ensure_question_indexes
+from evaluation import submit_answer, submit_interview, refresh_feedback, wait_for_feedback
+from timeline import Timeline, load_timeline, question_summary
 
 # ---------------------------
-# MongoDB Connection (for interview feedback and face logs)
+# MongoDB Connection (for face logs)
 # ---------------------------
 client = MongoClient("mongodb://localhost:27017/")
 db = client["mock_interviews"]
-feedback_collection = db["feedbacks"]
+EVALUATION_MODES = {"per_answer": "After each answer", "batch": "All at the end (one request)"}
+STATUS_LABELS = {"pending": "⏳ evaluating", "complete": "✅ evaluated", "failed": "⚠️ evaluation failed"}
 
 
 def store_face_log(student_id, message):
@@ -87,6 +95,9 @@ class VideoTransformer(VideoTransformerBase):
         # Optional: student id to log violations.
         self.student_id = None
 
+        # Optional: timeline.Timeline counting violations per time bucket.
+        self.timeline = None
+
     def transform(self, frame):
         img = frame.to_ndarray(format="bgr24")
 
@@ -107,6 +118,8 @@ class VideoTransformer(VideoTransformerBase):
             if self.no_face_frames >= self.frame_threshold:
                 if current_time - self.last_no_face_warning_time > self.warning_interval:
                     self.no_face_warning_count += 1
+                    if self.timeline is not None:
+                        self.timeline.record("No Face Detected!")
                     self.last_no_face_warning_time = current_time
                     if self.student_id:
                         store_face_log(self.student_id, "No Face Detected!")
@@ -122,6 +135,8 @@ class VideoTransformer(VideoTransformerBase):
             if self.multiple_face_frames >= self.frame_threshold:
                 if current_time - self.last_multiple_warning_time > self.warning_interval:
                     self.multiple_face_warning_count += 1
+                    if self.timeline is not None:
+                        self.timeline.record("Multiple Faces Detected!")
                     self.last_multiple_warning_time = current_time
                     if self.student_id:
                         store_face_log(self.student_id, "Multiple Faces Detected!")
@@ -173,6 +188,8 @@ class VideoTransformer(VideoTransformerBase):
                 violation_message = "Not Looking at Screen!"
                 if current_time - self.last_eye_gaze_warning_time > self.warning_interval:
                     self.eye_gaze_warning_count += 1
+                    if self.timeline is not None:
+                        self.timeline.record("Not Looking at Screen!")
                     self.last_eye_gaze_warning_time = current_time
                     if self.student_id:
                         store_face_log(self.student_id, "Not Looking at Screen!")
@@ -216,26 +233,21 @@ RTC_CONFIGURATION = RTCConfiguration({
 # ---------------------------
 # Interview Functions (Remaining parts unchanged)
 # ---------------------------
-def get_gemini_questions(job_role, tech_stack, experience):
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    prompt = f"""
-    Generate five interview questions for a {job_role} role requiring experience in {tech_stack}. 
-    The candidate has {experience} years of experience. Ensure the questions assess relevant skills and knowledge.
-    """
-    response = model.generate_content([prompt])
-    questions = response.text.split("\n")
-    filtered_questions = []
-    for question in questions:
-        question = question.strip()
-        if question and question[0].isdigit():
-            if not question.endswith("?"):
-                question += "?"
-            filtered_questions.append(question)
-    return filtered_questions
+@st.cache_resource
+def init_question_bank():
+    # Once per server process, so question-set lookups are indexed even before the first prewarm run
+    ensure_question_indexes()
+
+
+init_question_bank()
+
+
+def get_gemini_questions(job_role, tech_stack, experience, placeholder=None):
+    # Usually a cache read; only new role/stack/experience combinations stream a fresh set from the model
+    return get_question_set(job_role, tech_stack, experience, placeholder.markdown if placeholder else None)
 
 
 def process_answer(question, answer):
-    model = genai.GenerativeModel('gemini-1.5-flash')
     prompt = f"""
     Evaluate the following candidate's answer to an interview question. 
     Provide a score out of 10 based on correctness, depth, and relevance, and give detailed feedback.
@@ -243,8 +255,20 @@ def process_answer(question, answer):
     Question: {question}
     Answer: {answer}
     """
-    response = model.generate_content([prompt])
-    return response.text
+    # Runs on the evaluation worker, which cannot draw on the page, so nothing is streamed
+    return llm_gateway.generate([prompt], label="feedback")
+
+
+def show_timeline(interview):
+    """Per-question proctoring summary from the interview's timeline (one database read)."""
+    st.session_state.timeline.flush()
+    document = load_timeline(interview["interview_id"])
+    if document is None:
+        return
+    rows = [{"Question": row["question"], "Seconds": row["seconds"], **row["violations"]}
+            for row in question_summary(document)[:len(interview["questions"])]]
+    st.markdown("### Proctoring Timeline")
+    st.dataframe(rows, hide_index=True)
 
 
 def record_audio():
@@ -299,29 +323,34 @@ if "current_interview" not in st.session_state:
             job_role = st.text_input("Job Role/Job Position", placeholder="Ex. Full Stack Developer")
             tech_stack = st.text_input("Job Description/Tech Stack", placeholder="Ex. React, Angular, Node.js")
             experience = st.number_input("Years of Experience", min_value=0, step=1)
+            evaluation_mode = st.selectbox("Feedback", options=list(EVALUATION_MODES), format_func=EVALUATION_MODES.get)
             start_btn = st.form_submit_button("Start Interview")
             cancel_btn = st.form_submit_button("Cancel")
             if cancel_btn:
                 st.session_state.show_form = False
                 rerun_app()
             if start_btn and username and job_role and tech_stack:
-                questions = get_gemini_questions(job_role, tech_stack, experience)
+                questions = get_gemini_questions(job_role, tech_stack, experience, st.empty())
                 interview_data = {
+                    "interview_id": uuid.uuid4().hex,
                     "username": username,
                     "role": job_role,
                     "stack": tech_stack,
                     "experience": experience,
                     "questions": questions,
+                    "evaluation_mode": evaluation_mode,
                     "responses": []
                 }
                 st.session_state.current_interview = interview_data
                 st.session_state.interviews.append(interview_data)
                 st.session_state.show_form = False
                 st.session_state.question_index = 0
+                st.session_state.timeline = Timeline(interview_data["interview_id"], username)
                 # Enable proctoring and set student_id.
                 if camera is not None and hasattr(camera, "video_transformer") and camera.video_transformer is not None:
                     camera.video_transformer.proctoring_enabled = True
                     camera.video_transformer.student_id = username
+                    camera.video_transformer.timeline = st.session_state.timeline
                 rerun_app()
 
 # ---------------------------
@@ -355,28 +384,38 @@ if "current_interview" in st.session_state:
             with col2:
                 if st.button("Next Question", key=f"next_{index}"):
                     answer = st.session_state.get(answer_widget_key, "")
-                    feedback = process_answer(interview["questions"][index], answer)
+                    question = interview["questions"][index]
                     response_data = {
                         "username": interview["username"],
-                        "question": interview["questions"][index],
-                        "answer": answer,
-                        "feedback": feedback
+                        "question": question,
+                        "answer": answer
                     }
-                    feedback_collection.insert_one(response_data)
                     interview["responses"].append(response_data)
+                    if interview["evaluation_mode"] == "batch":
+                        # All answers are scored together once the last one is in
+                        if index + 1 == len(interview["questions"]):
+                            submit_interview(interview["responses"])
+                    else:
+                        # Evaluated in the background so the next question shows up immediately
+                        submit_answer(response_data, lambda: process_answer(question, answer))
+                    st.session_state.timeline.set_question(index + 1)
+                    st.session_state.timeline.flush()
                     st.session_state.question_index += 1
                     rerun_app()
         else:
             # Disable proctoring once the final answer is submitted.
             if camera is not None and hasattr(camera, "video_transformer"):
                 camera.video_transformer.proctoring_enabled = False
+                camera.video_transformer.timeline = None
 
             st.success("Interview Completed!")
             st.markdown("## Interview Summary")
+            pending_ids = refresh_feedback(interview["responses"])
             for idx, response in enumerate(interview["responses"]):
-                with st.expander(f"Question {idx + 1}: {response['question']}"):
+                with st.expander(f"Question {idx + 1}: {response['question']} ({STATUS_LABELS[response['status']]})"):
                     st.markdown(f"**Your Answer:** {response['answer']}")
-                    st.markdown(f"**Feedback:** {response['feedback']}")
+                    st.markdown(f"**Feedback:** {response['feedback'] or 'Evaluation in progress...'}")
+            show_timeline(interview)
             if st.button("Close Interview"):
                 # Reset warning counters.
                 if camera is not None and hasattr(camera, "video_transformer"):
@@ -387,6 +426,11 @@ if "current_interview" in st.session_state:
                 del st.session_state["current_interview"]
                 del st.session_state["question_index"]
                 rerun_app()
+            if pending_ids:
+                # Only the evaluations still outstanding are waited for
+                with st.spinner(f"Waiting for {len(pending_ids)} evaluation(s)..."):
+                    wait_for_feedback(pending_ids)
+                rerun_app()
 
 # ---------------------------
 # Previous Mock Interviews (when no active interview)
@@ -398,7 +442,12 @@ if "current_interview" not in st.session_state and st.session_state.interviews:
                 f"{interview['role']} - {interview['experience']} Years (Created At: {datetime.now().strftime('%Y-%m-%d')})"
         ):
             st.write(f"Tech Stack: {interview['stack']}")
+            refresh_feedback(interview["responses"])
             for response in interview["responses"]:
                 st.write(f"**Q:** {response['question']}")
                 st.write(f"**Your Answer:** {response['answer']}")
-                st.write(f"**Feedback:** {response['feedback']}")
+                st.write(f"**Feedback:** {response['feedback'] or 'Evaluation in progress...'}")
+
+with st.sidebar.expander("Model call metrics"):
+    # Per-process totals since the server started
+    st.dataframe(llm_gateway.metrics_rows(), hide_index=True)
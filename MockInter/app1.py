@@ -2,49 +2,41 @@ import streamlit as st
 import openai
 import time
 import os
+import sys
 import json
-import google.generativeai as genai
+import uuid
 import numpy as np
 import speech_recognition as sr
 from datetime import datetime
-from pymongo import MongoClient
 from dotenv import load_dotenv
-from deepface import DeepFace
-import cv2
-from PIL import Image
-import threading
 
 # Load environment variables
 load_dotenv()
 
-genai.configure(api_key=os.getenv('API_KEY'))
+# Model calls go through the shared gateway (it reads API_KEY and the LLM_* settings)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+import llm_gateway
+llm_gateway.configure_logging()
+from question_bank import get_question_set, ensure_indexes as ensure_question_indexes
+from evaluation import submit_answer, submit_interview, refresh_feedback, wait_for_feedback
+from emotion import EmotionTracker
+from timeline import Timeline, load_timeline, question_summary
 
-# Connect to MongoDB
-client = MongoClient("mongodb://localhost:27017/")
-db = client["mock_interviews"]
-feedback_collection = db["feedbacks"]
+EVALUATION_MODES = {"per_answer": "After each answer", "batch": "All at the end (one request)"}
+
+@st.cache_resource
+def init_question_bank():
+    # Once per server process, so question-set lookups are indexed even before the first prewarm run
+    ensure_question_indexes()
 
-def get_gemini_questions(job_role, tech_stack, experience):
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    prompt = f"""
-    Generate five interview questions for a {job_role} role requiring experience in {tech_stack}. 
-    The candidate has {experience} years of experience. Ensure the questions assess relevant skills and knowledge.
-    """
-    response = model.generate_content([prompt])
-    questions = response.text.split("\n")
-    filtered_questions = []
-
-    for i, question in enumerate(questions):
-        question = question.strip()
-        if question and question[0].isdigit() and not question.endswith("?"):
-            question += "?"
-        if question and question[0].isdigit():
-            filtered_questions.append(question)
-    
-    return filtered_questions
+
+init_question_bank()
+
+def get_gemini_questions(job_role, tech_stack, experience, placeholder=None):
+    # Usually a cache read; only new role/stack/experience combinations stream a fresh set from the model
+    return get_question_set(job_role, tech_stack, experience, placeholder.markdown if placeholder else None)
 
 def process_answer(question, answer, avg_emotion):
-    model = genai.GenerativeModel('gemini-1.5-flash')
     prompt = f"""
     Evaluate the following candidate's answer to an interview question. 
     Provide a score out of 10 based on correctness, depth, and relevance, and give detailed feedback.
@@ -53,8 +45,8 @@ def process_answer(question, answer, avg_emotion):
     Answer: {answer}
     Average Emotion: {avg_emotion}
     """
-    response = model.generate_content([prompt])
-    return response.text
+    # Runs on the evaluation worker, which cannot draw on the page, so nothing is streamed
+    return llm_gateway.generate([prompt], label="feedback")
 
 def record_audio():
     recognizer = sr.Recognizer()
@@ -69,56 +61,6 @@ def record_audio():
     except sr.RequestError:
         return "Could not request results"
 
-# Track emotions in the background
-emotion_list = []
-emotion_lock = threading.Lock()
-
-def track_emotions_from_webcam():
-    global emotion_list
-    cap = cv2.VideoCapture(0)
-
-    if not cap.isOpened():
-        st.error("Could not access the webcam")
-        return None
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            st.error("Failed to grab frame from webcam")
-            break
-
-        try:
-            # Analyze emotion using DeepFace
-            result = DeepFace.analyze(frame, actions=['emotion'], enforce_detection=False)
-            dominant_emotion = result[0]['dominant_emotion']
-            
-            # Use a lock to safely update the shared emotion list
-            with emotion_lock:
-                emotion_list.append(dominant_emotion)
-
-        except Exception as e:
-            st.write("Error in emotion detection:", e)
-        
-        # Display webcam feed in Streamlit (just to show webcam)
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img = Image.fromarray(frame_rgb)
-        st.image(img, caption="Live Webcam Feed", use_column_width=True)
-
-        # Stop button to end emotion tracking
-        if st.button("Stop Emotion Tracking"):
-            break
-
-    cap.release()
-
-# Get the dominant emotion from the list of detected emotions
-def get_avg_emotion():
-    with emotion_lock:
-        if emotion_list:
-            avg_emotion = max(set(emotion_list), key=emotion_list.count)  # Mode of the emotions
-            return avg_emotion
-        else:
-            return "No emotions detected"
-
 if "interviews" not in st.session_state:
     st.session_state.interviews = []
 
@@ -134,6 +76,7 @@ if "show_form" in st.session_state and st.session_state.show_form:
         job_role = st.text_input("Job Role/Job Position", placeholder="Ex. Full Stack Developer")
         tech_stack = st.text_input("Job Description/Tech Stack", placeholder="Ex. React, Angular, Node.js")
         experience = st.number_input("Years of Experience", min_value=0, step=1)
+        evaluation_mode = st.selectbox("Feedback", options=list(EVALUATION_MODES), format_func=EVALUATION_MODES.get)
         start_btn = st.form_submit_button("Start Interview")
         cancel_btn = st.form_submit_button("Cancel")
         
@@ -142,23 +85,45 @@ if "show_form" in st.session_state and st.session_state.show_form:
             st.rerun()
         
         if start_btn:
-            questions = get_gemini_questions(job_role, tech_stack, experience)
+            questions = get_gemini_questions(job_role, tech_stack, experience, st.empty())
             interview_data = {
+                "interview_id": uuid.uuid4().hex,
                 "username": username,
                 "role": job_role,
                 "stack": tech_stack,
                 "experience": experience,
                 "questions": questions,
+                "evaluation_mode": evaluation_mode,
                 "responses": []
             }
             st.session_state.current_interview = interview_data
             st.session_state.interviews.append(interview_data)
             st.session_state.show_form = False
             st.session_state.question_index = 0
-            # Start background emotion tracking
-            threading.Thread(target=track_emotions_from_webcam, daemon=True).start()
+            # Start background emotion tracking, scoped to this session and to the first question
+            if "emotion_tracker" not in st.session_state:
+                st.session_state.emotion_tracker = EmotionTracker()
+            st.session_state.emotion_tracker.start_question(0)
+            st.session_state.timeline = Timeline(interview_data["interview_id"], username)
+            st.session_state.emotion_tracker.timeline = st.session_state.timeline
+            st.session_state.emotion_tracker.start()
             st.rerun()
 
+# Live webcam snapshot and emotion status; the tracker thread itself never touches Streamlit
+tracker = st.session_state.get("emotion_tracker")
+if tracker is not None:
+    with st.sidebar:
+        # Shown even after the capture thread exits, e.g. when the webcam could not be opened
+        if tracker.error:
+            st.error(tracker.error)
+        if tracker.running:
+            if tracker.latest_frame is not None:
+                st.image(tracker.latest_frame, caption="Live Webcam Feed", use_column_width=True)
+            st.markdown(f"**Current emotion (this question):** {tracker.question_emotion()}")
+            if st.button("Stop Emotion Tracking"):
+                tracker.stop()
+                st.rerun()
+
 if "current_interview" in st.session_state:
     interview = st.session_state.current_interview
     st.subheader(f"Job Role: {interview['role']}")
@@ -190,42 +155,72 @@ if "current_interview" in st.session_state:
                 answer = st.session_state.answer_text if "answer_text" in st.session_state else ""
                 st.session_state.answer_text = ""  # Clear the answer text after moving to next question
                 
-                # Get the current dominant emotion (average) after the answer is submitted
-                avg_emotion = get_avg_emotion()
-
-                # Submit the answer and get feedback along with the average emotion
-                feedback = process_answer(interview["questions"][index], answer, avg_emotion)
+                # Dominant emotion while this question was on screen; the next question gets a fresh scope
+                avg_emotion = tracker.question_emotion() if tracker is not None else "No emotions detected"
+                if tracker is not None:
+                    tracker.start_question(index + 1)
+                st.session_state.timeline.set_question(index + 1)
+                st.session_state.timeline.flush()
+
+                # Submit the answer; feedback (with the average emotion) is generated in the background
+                question = interview["questions"][index]
                 response_data = {
                     "username": interview["username"],
-                    "question": interview["questions"][index],
+                    "question": question,
                     "answer": answer,
-                    "feedback": feedback,
                     "emotion": avg_emotion
                 }
-                feedback_collection.insert_one(response_data)
                 interview["responses"].append(response_data)
+                if interview["evaluation_mode"] == "batch":
+                    # All answers are scored together once the last one is in
+                    if index + 1 == len(interview["questions"]):
+                        submit_interview(interview["responses"])
+                else:
+                    submit_answer(response_data, lambda: process_answer(question, answer, avg_emotion))
                 st.session_state.question_index += 1
                 st.rerun()
     else:
         st.success("Interview Completed! Generating Feedback...")
+        pending_ids = refresh_feedback(interview["responses"])
         for response in interview["responses"]:
             st.write(f"**Q:** {response['question']}")
             st.write(f"**Your Answer:** {response['answer']}")
-            st.write(f"**Feedback:** {response['feedback']}")
+            st.write(f"**Feedback:** {response['feedback'] or 'Evaluation in progress...'}")
             st.write(f"**Emotion:** {response['emotion']}")
 
+        # Emotion mix per question from the interview timeline (one database read)
+        st.session_state.timeline.flush()
+        document = load_timeline(interview["interview_id"])
+        if document is not None:
+            st.markdown("### Emotion Timeline")
+            st.dataframe([{"Question": row["question"], "Seconds": row["seconds"], **row["emotions"]}
+                          for row in question_summary(document)[:len(interview["questions"])]], hide_index=True)
+
         if st.button("Close Interview"):
+            if tracker is not None:
+                tracker.stop()
+                tracker.timeline = None
             del st.session_state["current_interview"]
             del st.session_state["question_index"]
             st.rerun()
+        if pending_ids:
+            # Only the evaluations still outstanding are waited for
+            with st.spinner(f"Waiting for {len(pending_ids)} evaluation(s)..."):
+                wait_for_feedback(pending_ids)
+            st.rerun()
 
 if st.session_state.interviews:
     st.subheader("Previous Mock Interviews")
     for i, interview in enumerate(st.session_state.interviews):
         with st.expander(f"{interview['role']} - {interview['experience']} Years (Created At: {datetime.now().strftime('%Y-%m-%d')})"):
             st.write(f"Tech Stack: {interview['stack']}")
+            refresh_feedback(interview["responses"])
             for response in interview["responses"]:
                 st.write(f"**Q:** {response['question']}")
                 st.write(f"**Your Answer:** {response['answer']}")
-                st.write(f"**Feedback:** {response['feedback']}")
+                st.write(f"**Feedback:** {response.get('feedback') or 'Evaluation in progress...'}")
                 st.write(f"**Emotion:** {response['emotion']}")
+
+with st.sidebar.expander("Model call metrics"):
+    # Per-process totals since the server started
+    st.dataframe(llm_gateway.metrics_rows(), hide_index=True)
@@ -0,0 +1,182 @@
+import os
+import time
+import queue
+import logging
+import threading
+
+import cv2
+import numpy as np
+
+# Emotion tracking for mock interviews: camera frames are sampled per session and analyzed by one
+# shared inference worker; results land in fixed-size ring buffers scoped to the session and the question.
+EMOTIONS = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+EMOTION_INDEX = {emotion: i for i, emotion in enumerate(EMOTIONS)}
+SAMPLE_INTERVAL = float(os.getenv("EMOTION_SAMPLE_SECONDS", "1.0"))  # seconds between analyzed frames
+RING_SIZE = 600  # samples kept per scope (10 minutes at one sample a second)
+QUEUE_SIZE = 8  # frames waiting for inference; newer frames are dropped while it is full
+NO_EMOTION = "No emotions detected"
+RESTART_SECONDS = 30  # wait before retrying a worker whose model failed to load
+
+logger = logging.getLogger(__name__)
+
+
+class EmotionRing:
+    """Fixed-size ring of emotion samples with running per-emotion counts (O(1) push, O(#emotions) mode)."""
+
+    def __init__(self, size=RING_SIZE):
+        self.samples = [None] * size
+        self.counts = [0] * len(EMOTIONS)
+        self.position = 0
+        self.lock = threading.Lock()
+
+    def push(self, emotion):
+        index = EMOTION_INDEX[emotion]
+        with self.lock:
+            evicted = self.samples[self.position]
+            if evicted is not None:
+                self.counts[evicted] -= 1
+            self.samples[self.position] = index
+            self.counts[index] += 1
+            self.position = (self.position + 1) % len(self.samples)
+
+    def histogram(self):
+        with self.lock:
+            return dict(zip(EMOTIONS, self.counts))
+
+    def dominant(self):
+        with self.lock:
+            best = max(range(len(EMOTIONS)), key=self.counts.__getitem__)
+            return EMOTIONS[best] if self.counts[best] else NO_EMOTION
+
+
+class _InferenceWorker:
+    """Single process-wide thread running DeepFace on queued frames with the model loaded once."""
+
+    def __init__(self):
+        self.frames = queue.Queue(maxsize=QUEUE_SIZE)
+        self.error = None
+        self.failed_at = None
+        self.thread = threading.Thread(target=self._run, name="emotion-inference", daemon=True)
+        self.thread.start()
+
+    def submit(self, tracker, frame):
+        """Queue a frame for analysis; returns False (frame dropped) when the worker is behind or has failed."""
+        if self.error is not None:
+            tracker.error = self.error
+            return False
+        try:
+            self.frames.put_nowait((tracker, frame))
+            return True
+        except queue.Full:
+            return False
+
+    def _run(self):
+        try:
+            from deepface import DeepFace
+            # Warm-up call builds and caches the emotion model before the first real frame
+            DeepFace.analyze(np.zeros((48, 48, 3), dtype=np.uint8), actions=['emotion'], enforce_detection=False)
+        except Exception as e:
+            logger.exception("Emotion model failed to load")
+            self.failed_at = time.monotonic()
+            self.error = f"Emotion detection unavailable: {e}"
+            return
+        while True:
+            tracker, frame = self.frames.get()
+            try:
+                result = DeepFace.analyze(frame, actions=['emotion'], enforce_detection=False)
+                tracker.record(result[0]['dominant_emotion'])
+                tracker.error = None
+            except Exception as e:
+                tracker.error = f"Error in emotion detection: {e}"
+                logger.warning(tracker.error)
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_worker():
+    """The shared inference worker, restarted RESTART_SECONDS after its model failed to load."""
+    global _worker
+    with _worker_lock:
+        if _worker is None or (_worker.failed_at is not None
+                               and time.monotonic() - _worker.failed_at > RESTART_SECONDS):
+            _worker = _InferenceWorker()
+        return _worker
+
+
+class EmotionTracker:
+    """Per-session webcam sampler; keep one in st.session_state.
+
+    The capture thread never calls Streamlit: the page reads latest_frame, error and the rings on rerun.
+    """
+
+    def __init__(self, camera_index=0, sample_interval=SAMPLE_INTERVAL):
+        self.camera_index = camera_index
+        self.sample_interval = sample_interval
+        self.session = EmotionRing()
+        self.question = EmotionRing()
+        self.question_index = 0
+        self.latest_frame = None
+        self.error = None
+        self.dropped = 0
+        self.timeline = None  # optional timeline.Timeline that also receives every sample
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._capture, name="emotion-capture", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def start_question(self, index):
+        """Begin a new per-question scope; the session scope keeps accumulating."""
+        self.question_index = index
+        self.question = EmotionRing()
+
+    def record(self, emotion):
+        if emotion in EMOTION_INDEX:
+            self.session.push(emotion)
+            self.question.push(emotion)
+            if self.timeline is not None:
+                self.timeline.record(emotion)
+
+    def question_emotion(self):
+        return self.question.dominant()
+
+    def session_emotion(self):
+        return self.session.dominant()
+
+    def _capture(self):
+        cap = cv2.VideoCapture(self.camera_index)
+        if not cap.isOpened():
+            self.error = "Could not access the webcam"
+            return
+        try:
+            next_sample = time.monotonic()
+            while not self.stop_event.is_set():
+                # grab() keeps the driver buffer fresh without decoding frames that are not sampled
+                if not cap.grab():
+                    self.error = "Failed to grab frame from webcam"
+                    break
+                now = time.monotonic()
+                if now < next_sample:
+                    continue
+                next_sample = now + self.sample_interval
+                ret, frame = cap.retrieve()
+                if not ret:
+                    continue
+                self.latest_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                # Looked up per sample so a restarted worker is picked up
+                if not get_worker().submit(self, frame):
+                    self.dropped += 1
+        finally:
+            cap.release()
@@ -0,0 +1,167 @@
+import os
+import re
+import sys
+import json
+import time
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+import llm_gateway
+
+# Answer evaluation off the request path: answers are stored as pending and a worker fills in the feedback
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
+EVALUATION_WORKERS = 4
+POLL_INTERVAL = 0.5
+WAIT_SLICE = 1.0  # seconds a page blocks before rerunning, so its buttons stay responsive
+EVALUATION_TIMEOUT = 180  # seconds after submission before a still-pending answer is shown as failed
+
+logger = logging.getLogger(__name__)
+
+# Batched mode: every answer of an interview is scored in one structured request
+batch_prompt = """
+Evaluate each of the candidate's answers to the interview questions below.
+For every question give a score out of 10 based on correctness, depth, and relevance, and detailed feedback.
+Answer with a single JSON object:
+
+{"evaluations": [{"question_number": <1-based number>, "score": <integer 0-10>, "feedback": "<detailed feedback>"}]}
+"""
+
+client = MongoClient(MONGO_URI)
+feedback_collection = client["mock_interviews"]["feedbacks"]
+
+# Module-level so it outlives Streamlit reruns and is shared by every session in the process
+_executor = ThreadPoolExecutor(max_workers=EVALUATION_WORKERS, thread_name_prefix="evaluation")
+
+
+def _evaluate(response_id, evaluate):
+    try:
+        update = {"feedback": evaluate(), "status": "complete"}
+    except Exception as e:
+        logger.exception("Evaluation failed for %s", response_id)
+        update = {"feedback": f"Evaluation failed: {e}", "status": "failed"}
+    update["evaluated_at"] = datetime.utcnow()
+    try:
+        feedback_collection.update_one({"_id": response_id}, {"$set": update})
+    except Exception as e:
+        logger.exception("Storing feedback failed for %s", response_id)
+        try:
+            feedback_collection.update_one({"_id": response_id}, {"$set": {
+                "feedback": f"Evaluation failed: {e}", "status": "failed", "evaluated_at": datetime.utcnow()}})
+        except Exception:
+            # Still pending in the database; refresh_feedback times it out
+            logger.exception("Marking %s as failed also failed", response_id)
+
+
+def submit_answer(response_data, evaluate):
+    """Store the answer as pending and evaluate it in the background; evaluate() returns the feedback text.
+
+    response_data gets its _id, status and empty feedback filled in, so the caller can keep it for the summary.
+    """
+    response_data.update({"feedback": "", "status": "pending", "submitted_at": datetime.utcnow()})
+    feedback_collection.insert_one(response_data)
+    _executor.submit(_evaluate, response_data["_id"], evaluate)
+    return response_data["_id"]
+
+
+def stub_batch_evaluation(contents):
+    """Stub backend answer for the batched prompt: a middling score for every question."""
+    count = len(re.findall(r"^Question \d+:", contents[-1], flags=re.MULTILINE))
+    return json.dumps({"evaluations": [{"question_number": number, "score": 5, "feedback": "Stub feedback."}
+                                       for number in range(1, count + 1)]})
+
+
+llm_gateway.register_stub_responder("batch_feedback", stub_batch_evaluation)
+
+
+def evaluate_batch(responses):
+    """Score all answers with one model request; returns one {score, feedback} dict per response ({} if missing)."""
+    items = []
+    for number, response in enumerate(responses, 1):
+        item = f"Question {number}: {response['question']}\nAnswer: {response['answer']}"
+        if response.get("emotion"):
+            item += f"\nAverage Emotion: {response['emotion']}"
+        items.append(item)
+    text = llm_gateway.generate([batch_prompt, "\n\n".join(items)], label="batch_feedback",
+                                generation_config={"response_mime_type": "application/json"})
+    evaluations = {evaluation.get("question_number"): evaluation
+                   for evaluation in json.loads(text).get("evaluations", [])}
+    return [evaluations.get(number, {}) for number in range(1, len(responses) + 1)]
+
+
+def _evaluate_interview(responses):
+    try:
+        results = evaluate_batch(responses)
+        for response, result in zip(responses, results):
+            if result:
+                response.update(score=result.get("score"), status="complete",
+                                feedback=f"Score: {result.get('score')}/10\n\n{result.get('feedback', '')}")
+            else:
+                response.update(feedback="Evaluation failed: no feedback returned for this question", status="failed")
+    except Exception as e:
+        logger.exception("Batched evaluation failed")
+        for response in responses:
+            response.update(feedback=f"Evaluation failed: {e}", status="failed")
+    now = datetime.utcnow()
+    for response in responses:
+        response["evaluated_at"] = now
+    try:
+        feedback_collection.insert_many(responses)
+    except Exception:
+        # Nothing was stored; refresh_feedback times these answers out
+        logger.exception("Storing batched feedback failed")
+
+
+def submit_interview(responses):
+    """Evaluate a finished interview's answers in one background request, stored with a single insert_many.
+
+    Ids are assigned up front so refresh_feedback/wait_for_feedback work as in per-answer mode.
+    """
+    now = datetime.utcnow()
+    for response in responses:
+        response.update({"_id": ObjectId(), "feedback": "", "status": "pending", "submitted_at": now})
+    # The worker gets copies so it never mutates dicts the UI is rendering
+    _executor.submit(_evaluate_interview, [dict(response) for response in responses])
+    return [response["_id"] for response in responses]
+
+
+def refresh_feedback(responses, timeout=EVALUATION_TIMEOUT):
+    """Copy finished feedback from the database into responses; returns the ids still pending.
+
+    Answers pending for longer than timeout since submission are marked failed, so the page stops waiting.
+    """
+    pending = {response["_id"]: response for response in responses if response.get("status") == "pending"}
+    if not pending:
+        return []
+    for doc in feedback_collection.find({"_id": {"$in": list(pending)}, "status": {"$ne": "pending"}},
+                                        {"feedback": 1, "status": 1}):
+        pending.pop(doc["_id"]).update(feedback=doc["feedback"], status=doc["status"])
+    now = datetime.utcnow()
+    expired = [response_id for response_id, response in pending.items()
+               if (now - response["submitted_at"]).total_seconds() > timeout]
+    if expired:
+        failed = {"feedback": "Evaluation failed: timed out", "status": "failed", "evaluated_at": now}
+        for response_id in expired:
+            pending.pop(response_id).update(failed)
+        # Per-answer documents exist and stay pending otherwise; batched ones may never have been stored
+        feedback_collection.update_many({"_id": {"$in": expired}, "status": "pending"}, {"$set": failed})
+    return list(pending)
+
+
+def wait_for_feedback(response_ids, timeout=WAIT_SLICE):
+    """Block until all of response_ids are stored and evaluated (or timeout); returns True if all finished.
+
+    Pages call this with a short timeout and rerun, so a click is handled within about a second.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        # Batched answers are only inserted once evaluated, so count finished documents rather than pending ones
+        finished = feedback_collection.count_documents({"_id": {"$in": response_ids}, "status": {"$ne": "pending"}})
+        if finished == len(response_ids):
+            return True
+        time.sleep(POLL_INTERVAL)
+    return False
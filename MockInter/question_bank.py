@@ -0,0 +1,130 @@
+import os
+import re
+import sys
+import hashlib
+import argparse
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient, ASCENDING, DESCENDING
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+import llm_gateway
+
+# Interview question sets cached per normalized (role, stack, experience bucket), pre-warmed for popular combinations
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
+VARIANTS_PER_KEY = 3  # different question sets served in rotation for the same combination
+ROTATE_AFTER = timedelta(days=14)  # the oldest variant of a popular key is regenerated after this
+DEMAND_WINDOW = timedelta(days=30)
+EXPERIENCE_BUCKETS = [(1, "entry"), (4, "junior"), (9, "mid"), (None, "senior")]
+STACK_TOKEN = re.compile(r"[a-z0-9+#][a-z0-9+#.]*")
+STACK_STOPWORDS = {"and", "or", "with", "the", "a", "an", "in", "of", "experience", "knowledge"}
+
+client = MongoClient(MONGO_URI)
+db = client["mock_interviews"]
+question_sets = db["question_sets"]
+question_demand = db["question_demand"]
+
+
+def ensure_indexes():
+    question_sets.create_index([("key", ASCENDING), ("served", ASCENDING)])
+    question_demand.create_index([("last_requested", DESCENDING), ("count", DESCENDING)])
+
+
+def normalize_role(job_role):
+    return " ".join(re.sub(r"[^a-z0-9+#. ]", " ", (job_role or "").lower()).split())
+
+
+def stack_tokens(tech_stack):
+    """Sorted, de-duplicated stack tokens, so 'React, Node.js' and 'node.js and react' match."""
+    tokens = {token.rstrip(".") for token in STACK_TOKEN.findall((tech_stack or "").lower())}
+    return sorted(token for token in tokens if token and token not in STACK_STOPWORDS)
+
+
+def experience_bucket(experience):
+    for upper, name in EXPERIENCE_BUCKETS:
+        if upper is None or experience <= upper:
+            return name
+
+
+def question_key(job_role, tech_stack, experience):
+    normalized = f"{normalize_role(job_role)}|{','.join(stack_tokens(tech_stack))}|{experience_bucket(experience)}"
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def parse_questions(text):
+    """Numbered lines of the model's answer, each ending with a question mark."""
+    questions = []
+    for question in text.split("\n"):
+        question = question.strip()
+        if question and question[0].isdigit():
+            if not question.endswith("?"):
+                question += "?"
+            questions.append(question)
+    return questions
+
+
+def generate_questions(job_role, tech_stack, experience, on_text=None):
+    prompt = f"""
+    Generate five interview questions for a {job_role} role requiring experience in {tech_stack}.
+    The candidate has {experience} years of experience. Ensure the questions assess relevant skills and knowledge.
+    """
+    return parse_questions(llm_gateway.generate([prompt], label="questions", on_text=on_text))
+
+
+def store_variant(key, job_role, tech_stack, experience, questions):
+    question_sets.insert_one({"key": key, "role": job_role, "stack": tech_stack, "experience": experience,
+                              "questions": questions, "served": 0, "created_at": datetime.utcnow()})
+
+
+def record_demand(key, job_role, tech_stack, experience):
+    """Count requests per key; the first request's wording is kept for pre-warming."""
+    question_demand.update_one({"_id": key},
+                               {"$inc": {"count": 1}, "$set": {"last_requested": datetime.utcnow()},
+                                "$setOnInsert": {"role": job_role, "stack": tech_stack, "experience": experience}},
+                               upsert=True)
+
+
+def get_question_set(job_role, tech_stack, experience, on_text=None):
+    """Questions for an interview: the least-served cached variant, or a fresh set on a miss."""
+    key = question_key(job_role, tech_stack, experience)
+    record_demand(key, job_role, tech_stack, experience)
+    cached = question_sets.find_one_and_update({"key": key}, {"$inc": {"served": 1}},
+                                               sort=[("served", ASCENDING)], projection={"questions": 1})
+    if cached and cached["questions"]:
+        return cached["questions"]
+    questions = generate_questions(job_role, tech_stack, experience, on_text)
+    if questions:
+        store_variant(key, job_role, tech_stack, experience, questions)
+    return questions
+
+
+def prewarm(top_n=50):
+    """Fill popular keys up to VARIANTS_PER_KEY variants and rotate out their oldest stale variant."""
+    ensure_indexes()
+    generated = 0
+    since = datetime.utcnow() - DEMAND_WINDOW
+    for demand in question_demand.find({"last_requested": {"$gte": since}}).sort("count", DESCENDING).limit(top_n):
+        key = demand["_id"]
+        variants = list(question_sets.find({"key": key}, {"created_at": 1}).sort("created_at", ASCENDING))
+        if len(variants) >= VARIANTS_PER_KEY and datetime.utcnow() - variants[0]["created_at"] > ROTATE_AFTER:
+            question_sets.delete_one({"_id": variants[0]["_id"]})
+            variants = variants[1:]
+        for _ in range(VARIANTS_PER_KEY - len(variants)):
+            try:
+                questions = generate_questions(demand["role"], demand["stack"], demand["experience"])
+            except Exception as e:
+                print(f"Skipping {demand['role']} / {demand['stack']}: {e}")
+                break
+            if questions:
+                store_variant(key, demand["role"], demand["stack"], demand["experience"], questions)
+                generated += 1
+    return generated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generate question sets for popular interview combinations")
+    parser.add_argument("--top", type=int, default=50, help="number of most requested combinations to warm")
+    args = parser.parse_args()
+    print(f"Generated {prewarm(args.top)} question sets")
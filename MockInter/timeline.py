@@ -0,0 +1,167 @@
+import os
+import time
+import logging
+import threading
+from datetime import datetime
+
+import numpy as np
+from pymongo import MongoClient
+
+from emotion import EMOTIONS
+
+# Per-interview timeline: fixed-interval buckets of emotion and proctoring-violation counts,
+# stored as one packed document per interview so a whole session loads in a single read
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
+BUCKET_SECONDS = 5
+VIOLATIONS = ["No Face Detected!", "Multiple Faces Detected!", "Not Looking at Screen!"]
+CHANNELS = EMOTIONS + VIOLATIONS
+CHANNEL_INDEX = {channel: i for i, channel in enumerate(CHANNELS)}
+COUNT_DTYPE = "<u2"  # per-bucket counts never get near 65535
+OFFSET_DTYPE = "<u4"  # bucket start, in milliseconds since the interview started
+FLUSH_SECONDS = 30  # a dirty timeline is written at most this often from record()
+
+logger = logging.getLogger(__name__)
+
+client = MongoClient(MONGO_URI)
+timelines = client["mock_interviews"]["timelines"]
+
+
+class Timeline:
+    """Thread-safe bucketed counters for one interview, fed by the emotion tracker and the proctoring video thread.
+
+    Buckets follow a BUCKET_SECONDS grid, but a new one is also opened whenever a question starts, so no
+    bucket spans two questions; each bucket's start offset is stored alongside the counts.
+    """
+
+    def __init__(self, interview_id, username):
+        self.interview_id = interview_id
+        self.username = username
+        self.started_at = datetime.utcnow()
+        self.started = time.monotonic()
+        self.counts = np.zeros((64, len(CHANNELS)), dtype=COUNT_DTYPE)
+        self.offsets = np.zeros(64, dtype=OFFSET_DTYPE)
+        self.buckets = 1
+        self.question_starts = [0]  # bucket where each question begins
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.last_flush = time.monotonic()
+        # Writes are ordered by version so an older snapshot never replaces a newer one
+        self.version = 0
+        self.written_version = 0
+        self.write_lock = threading.Lock()
+
+    def _open_bucket(self, offset):
+        if self.buckets >= len(self.counts):
+            size = 2 * len(self.counts)
+            self.counts = np.resize(self.counts, (size, len(CHANNELS)))
+            self.counts[self.buckets:] = 0
+            self.offsets = np.resize(self.offsets, size)
+        self.counts[self.buckets] = 0
+        self.offsets[self.buckets] = offset
+        self.buckets += 1
+
+    def _bucket(self):
+        """Index of the current bucket, opening grid-aligned ones as time passes."""
+        elapsed = int((time.monotonic() - self.started) * 1000)
+        current = self.buckets - 1
+        bucket_ms = BUCKET_SECONDS * 1000
+        if elapsed - int(self.offsets[current]) >= bucket_ms:
+            self._open_bucket(elapsed - (elapsed - int(self.offsets[current])) % bucket_ms)
+        return self.buckets - 1
+
+    def record(self, channel):
+        """Count one emotion sample or violation in the current bucket."""
+        index = CHANNEL_INDEX.get(channel)
+        if index is None:
+            return
+        with self.lock:
+            self.counts[self._bucket(), index] += 1
+            self.dirty = True
+            due = time.monotonic() - self.last_flush > FLUSH_SECONDS
+        if due:
+            # Runs on the proctoring/emotion threads: a database error must not break frame processing.
+            # flush() has already marked the timeline dirty again, so the next flush retries.
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Timeline flush failed for %s", self.interview_id)
+
+    def set_question(self, index):
+        """Start question index (0-based) in a fresh bucket."""
+        with self.lock:
+            bucket = self._bucket()
+            now = int((time.monotonic() - self.started) * 1000)
+            if self.counts[bucket].any() or bucket in self.question_starts[:index]:
+                self._open_bucket(now)
+                bucket = self.buckets - 1
+            else:
+                # Nothing recorded in it yet, so the current bucket can simply start now
+                self.offsets[bucket] = now
+            del self.question_starts[index:]
+            self.question_starts.extend([bucket] * (index + 1 - len(self.question_starts)))
+            self.dirty = True
+
+    def flush(self):
+        """Write the whole timeline as one packed document (no-op when nothing changed)."""
+        with self.lock:
+            if not self.dirty:
+                return
+            self.version += 1
+            version = self.version
+            document = {
+                "username": self.username,
+                "started_at": self.started_at,
+                "bucket_seconds": BUCKET_SECONDS,
+                "channels": CHANNELS,
+                "buckets": self.buckets,
+                "counts": self.counts[:self.buckets].tobytes(),
+                "offsets": self.offsets[:self.buckets].tobytes(),
+                "duration": time.monotonic() - self.started,
+                "question_starts": list(self.question_starts),
+                "updated_at": datetime.utcnow(),
+            }
+            self.dirty = False
+            self.last_flush = time.monotonic()
+        # The database round trip happens outside self.lock so record() never waits on it
+        with self.write_lock:
+            if version <= self.written_version:
+                return
+            try:
+                timelines.replace_one({"_id": self.interview_id}, document, upsert=True)
+            except Exception:
+                with self.lock:
+                    self.dirty = True
+                raise
+            self.written_version = version
+
+
+def load_timeline(interview_id):
+    """One read: the timeline document with counts unpacked to a (buckets x channels) array, or None."""
+    document = timelines.find_one({"_id": interview_id})
+    if document is None:
+        return None
+    document["counts"] = np.frombuffer(document["counts"], dtype=COUNT_DTYPE).reshape(
+        document["buckets"], len(document["channels"]))
+    document["offsets"] = np.frombuffer(document["offsets"], dtype=OFFSET_DTYPE) / 1000.0
+    return document
+
+
+def question_summary(document):
+    """Per question: duration, dominant emotion, emotion histogram and violation counts."""
+    channels = document["channels"]
+    emotion_columns = [channels.index(emotion) for emotion in EMOTIONS if emotion in channels]
+    starts = document["question_starts"] + [document["buckets"]]
+    offsets = list(document["offsets"]) + [document["duration"]]
+    summary = []
+    for question, (start, end) in enumerate(zip(starts, starts[1:])):
+        totals = document["counts"][start:end].sum(axis=0)
+        histogram = {channels[i]: int(totals[i]) for i in emotion_columns}
+        summary.append({
+            "question": question + 1,
+            "seconds": round(offsets[end] - offsets[start]),
+            "dominant_emotion": max(histogram, key=histogram.get) if any(histogram.values()) else "",
+            "emotions": histogram,
+            "violations": {channel: int(totals[channels.index(channel)]) for channel in VIOLATIONS
+                           if channel in channels},
+        })
+    return summary
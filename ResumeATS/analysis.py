@@ -0,0 +1,183 @@
+import os
+import re
+import sys
+import json
+import threading
+from dotenv import load_dotenv
+
+from llm_cache import cached_call, content_hash, normalize_jd
+from ats_score import score_resume, build_vocabulary
+
+# Load environment variables from .env file (the gateway reads API_KEY and LLM_* settings)
+load_dotenv()
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+import llm_gateway
+
+MODEL_NAME = llm_gateway.DEFAULT_MODEL
+# Bump when a prompt or result shape changes so stale cache entries are not reused
+ANALYSIS_PROMPT_ID = "resume_match_v2"
+JD_PROFILE_PROMPT_ID = "jd_profile_v1"
+
+SKILL_CATEGORIES = ["Technical Skills", "Analytical Skills", "Soft Skills"]
+
+# The JD side is extracted once per job description and reused for every resume checked against it
+jd_profile_prompt = """
+You are an experienced Technical Human Resource Manager and an expert ATS (Applicant Tracking System) scanner.
+From the job description that follows, extract the skills and keywords a resume needs to maximize its impact
+and answer with a single JSON object:
+
+{"Technical Skills": [], "Analytical Skills": [], "Soft Skills": []}
+
+Note: Please do not make up the keywords, only answer from the job description provided.
+"""
+
+# Resume-side matching against an already extracted JD skill profile
+match_prompt = """
+You are an experienced Technical Human Resource Manager and an expert ATS (Applicant Tracking System) scanner.
+Review the provided resume against the job description and its required skills that follow, and answer with
+a single JSON object:
+
+{
+  "evaluation": "<professional evaluation of whether the candidate's profile aligns with the role,
+                 highlighting the strengths and weaknesses of the applicant in relation to the job requirements>",
+  "percentage": <integer 0-100 of how well the resume matches the job description>,
+  "missing_keywords": [<required skills from the list that the resume does not show>],
+  "final_thoughts": "<short summary>"
+}
+"""
+
+EVALUATION_START = re.compile(r'"evaluation"\s*:\s*"')
+
+# Per-process copy of JD profiles so bulk runs do not even hit the shared cache per resume
+_jd_profiles = {}
+_jd_profiles_lock = threading.Lock()
+
+
+def _strip_code_fence(text):
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    return text
+
+
+def partial_evaluation(text):
+    """The evaluation string from a JSON answer that may still be streaming in, or '' if not started."""
+    start = EVALUATION_START.search(text)
+    if not start:
+        return ""
+    body = text[start.end():]
+    end = re.search(r'(?<!\\)"', body)
+    body = body[:end.start()] if end else body.rstrip("\\")
+    try:
+        return json.loads(f'"{body}"')
+    except ValueError:
+        return body
+
+
+def parse_jd_profile(text):
+    """Parse the model's JD skill profile, keeping every category present."""
+    data = json.loads(_strip_code_fence(text))
+    return {category: list(data.get(category) or []) for category in SKILL_CATEGORIES}
+
+
+def parse_match(text):
+    """Parse the model's resume match answer with every expected field present."""
+    data = json.loads(_strip_code_fence(text))
+    return {
+        "evaluation": data.get("evaluation", ""),
+        "percentage": data.get("percentage"),
+        "missing_keywords": list(data.get("missing_keywords") or []),
+        "final_thoughts": data.get("final_thoughts", ""),
+    }
+
+
+def stub_jd_profile(contents):
+    """Stub backend answer for the JD profile prompt, built from the local ATS vocabulary."""
+    job_description = contents[-1].split("\n", 1)[-1]
+    return json.dumps({"Technical Skills": build_vocabulary(job_description)[:20], "Analytical Skills": [],
+                       "Soft Skills": []})
+
+
+def stub_match(contents):
+    """Stub backend answer for the match prompt, checking the profile skills against the resume text."""
+    resume_text = " ".join(part for part in contents[1:-2] if isinstance(part, str)).lower()
+    jd_profile = json.loads(contents[-1].split("\n", 1)[-1])
+    skills = [skill for category in SKILL_CATEGORIES for skill in jd_profile[category]]
+    missing = [skill for skill in skills if not re.search(rf"(?<![a-z0-9]){re.escape(skill.lower())}(?![a-z0-9])",
+                                                          resume_text)]
+    found = len(skills) - len(missing)
+    return json.dumps({
+        "evaluation": f"Stub evaluation: {found} of {len(skills)} JD skills found.",
+        "percentage": round(100 * found / len(skills)) if skills else 0,
+        "missing_keywords": missing,
+        "final_thoughts": "Generated by the stub model.",
+    })
+
+
+llm_gateway.register_stub_responder("jd_profile", stub_jd_profile)
+llm_gateway.register_stub_responder("resume_match", stub_match)
+
+
+def get_jd_profile(job_description, backend=llm_gateway.DEFAULT_BACKEND):
+    """Structured skill list for a JD, extracted once per normalized JD and shared through the cache."""
+    key = (content_hash(normalize_jd(job_description)), backend)
+    with _jd_profiles_lock:
+        profile = _jd_profiles.get(key)
+    if profile is not None:
+        return profile
+
+    def generate():
+        return parse_jd_profile(llm_gateway.generate([jd_profile_prompt, f"Job Description:\n{job_description}"],
+                                                     label="jd_profile", backend=backend,
+                                                     generation_config={"response_mime_type": "application/json"}))
+    if backend == "stub":
+        # Stub answers never go into the shared cache
+        profile = generate()
+    else:
+        # The profile does not depend on a resume, so the resume part of the cache key is left empty
+        profile = cached_call(JD_PROFILE_PROMPT_ID, "", job_description, MODEL_NAME, generate)
+    with _jd_profiles_lock:
+        _jd_profiles[key] = profile
+    return profile
+
+
+def local_analysis(resume_text, job_description):
+    """Analysis-shaped result from the local ATS scorer, used when the model is unavailable."""
+    local = score_resume(resume_text, job_description)
+    return {
+        "evaluation": "The AI model is unavailable; this is the local keyword-based ATS score only.",
+        "keywords": {"Technical Skills": [], "Analytical Skills": [], "Soft Skills": []},
+        "match": {"percentage": round(local["score"]), "missing_keywords": local["missing_keywords"],
+                  "final_thoughts": f"Keyword coverage {local['coverage']:.0%}, TF-IDF similarity {local['cosine']:.2f}."},
+    }
+
+
+def analyze_resume(pdf_content, job_description, resume_hash, backend=llm_gateway.DEFAULT_BACKEND,
+                   on_evaluation=None):
+    """Evaluation, keywords and match percentage for a resume, cached by resume and JD.
+
+    Keywords come from the JD profile; only the resume-side matching costs a model call per resume.
+    on_evaluation(text so far) is called while the evaluation streams in on a cache miss.
+    """
+    jd_profile = get_jd_profile(job_description, backend)
+
+    def generate():
+        on_text = (lambda text: on_evaluation(partial_evaluation(text))) if on_evaluation else None
+        # Only the complete answer is parsed and cached
+        return parse_match(llm_gateway.generate(
+            [match_prompt, *pdf_content, f"Job Description:\n{job_description}",
+             f"Required skills:\n{json.dumps(jd_profile)}"],
+            label="resume_match", on_text=on_text, backend=backend,
+            generation_config={"response_mime_type": "application/json"},
+        ))
+    if backend == "stub":
+        match = generate()
+    else:
+        match = cached_call(ANALYSIS_PROMPT_ID, resume_hash, job_description, MODEL_NAME, generate)
+    return {
+        "evaluation": match["evaluation"],
+        "keywords": jd_profile,
+        "match": {key: match[key] for key in ("percentage", "missing_keywords", "final_thoughts")},
+    }
@@ -1,49 +1,27 @@
-import os
 import streamlit as st
-import pdf2image
-import io
 import json
-import base64
-import google.generativeai as genai
-from dotenv import load_dotenv
+from resume_input import prepare_resume, PAGE_MODES, RENDER_DPI
+from llm_cache import content_hash
+from analysis import analyze_resume, local_analysis, get_jd_profile
+from candidate_index import index_resume
+from portal_auth import verify_login
+import llm_gateway  # on sys.path via analysis
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Configure Google Generative AI with the API key from .env
-genai.configure(api_key=os.getenv('API_KEY'))
-
-# Define cached functions
-@st.cache_data()
-def get_gemini_response(input, pdf_content, prompt):
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    response = model.generate_content([input, pdf_content[0], prompt])
-    return response.text
+llm_gateway.configure_logging()
 
 @st.cache_data()
-def get_gemini_response_keywords(input, pdf_content, prompt):
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    response = model.generate_content([input, pdf_content[0], prompt])
-    return json.loads(response.text[8:-4])
-
-@st.cache_data()
-def input_pdf_setup(uploaded_file):
-    if uploaded_file is not None:
-        images = pdf2image.convert_from_bytes(uploaded_file.read())
-        first_page = images[0]
-        img_byte_arr = io.BytesIO()
-        first_page.save(img_byte_arr, format='JPEG')
-        img_byte_arr = img_byte_arr.getvalue()
-        pdf_parts = [
-            {
-                "mime_type": "image/jpeg",
-                "data": base64.b64encode(img_byte_arr).decode()
-            }
-        ]
-        return pdf_parts
+def input_pdf_setup(pdf_bytes, page_mode="single", dpi=RENDER_DPI):
+    if pdf_bytes:
+        # Text layer first; only scanned resumes are rasterized (and only the pages the mode needs)
+        pdf_content, stats = prepare_resume(pdf_bytes, mode=page_mode, dpi=dpi)
+        return pdf_content, stats, content_hash(json.dumps(pdf_content, sort_keys=True))
     else:
         raise FileNotFoundError("No file uploaded")
 
+def show_resume_stats(stats):
+    st.caption(f"Resume sent as {stats['path']} ({stats['payload_bytes'] / 1024:.1f} KB, "
+               f"extract {stats['extract_seconds']:.2f}s, render {stats['render_seconds']:.2f}s)")
+
 # Streamlit App
 st.set_page_config(page_title="ATS Resume Scanner")
 st.header("Application Tracking System")
@@ -57,6 +35,28 @@ if uploaded_file is not None:
     st.write("PDF Uploaded Successfully")
     st.session_state.resume = uploaded_file
 
+with st.expander("Resume rendering options"):
+    page_mode = st.selectbox("Pages sent for analysis", options=list(PAGE_MODES), format_func=PAGE_MODES.get)
+    render_dpi = st.slider("Render DPI", min_value=72, max_value=300, value=RENDER_DPI, step=6)
+
+with st.expander("Share with recruiters"):
+    # The resume is published under the portal account, so the student must sign in with it
+    username = st.text_input("Your portal username")
+    password = st.text_input("Your portal password", type="password")
+    if st.button("Add my resume to candidate search"):
+        if st.session_state.resume is None or not username:
+            st.write("Please upload the resume and enter your username")
+        elif not verify_login("student", username, password):
+            st.error("Invalid username or password")
+        else:
+            _, resume_stats, resume_hash = input_pdf_setup(st.session_state.resume.getvalue(), page_mode, render_dpi)
+            if not resume_stats["text"].strip():
+                st.write("This resume has no text layer (scanned PDF), so it cannot be indexed")
+            elif index_resume(username, resume_stats["text"], resume_hash):
+                st.success("Your resume is now searchable by companies")
+            else:
+                st.write("This resume is already in candidate search")
+
 col1, col2, col3 = st.columns(3, gap="medium")
 
 with col1:
@@ -68,39 +68,40 @@ with col2:
 with col3:
     submit3 = st.button("Percentage match")
 
-input_prompt1 = """
- You are an experienced Technical Human Resource Manager, your task is to review the provided resume against the job description. 
- Please share your professional evaluation on whether the candidate's profile aligns with the role. 
- Highlight the strengths and weaknesses of the applicant in relation to the specified job requirements.
-"""
-
-input_prompt2 = """
-As an expert ATS (Applicant Tracking System) scanner with an in-depth understanding of AI and ATS functionality, 
-your task is to evaluate a resume against a provided job description. Please identify the specific skills and keywords 
-necessary to maximize the impact of the resume and provide response in json format as {Technical Skills:[], Analytical Skills:[], Soft Skills:[]}.
-
-Note: Please do not make up the answer, only answer from the job description provided.
-"""
-
-input_prompt3 = """
-You are a skilled ATS (Applicant Tracking System) scanner with a deep understanding of data science and ATS functionality, 
-your task is to evaluate the resume against the provided job description. Give me the percentage of match if the resume matches
-the job description. First the output should come as percentage and then keywords missing and last final thoughts.
-"""
+def get_analysis():
+    """Run (or reuse) the combined analysis for the current resume and job description."""
+    pdf_content, resume_stats, resume_hash = input_pdf_setup(st.session_state.resume.getvalue(), page_mode, render_dpi)
+    show_resume_stats(resume_stats)
+    # One model call serves all three buttons; the result is also kept for this session
+    session_key = (resume_hash, input_text)
+    if st.session_state.get("analysis_key") != session_key:
+        # The evaluation is shown as it streams in; the final answer replaces it below
+        streaming = st.empty()
+        try:
+            st.session_state.analysis = analyze_resume(pdf_content, input_text, resume_hash,
+                                                       on_evaluation=streaming.markdown)
+        except Exception as e:
+            # Fall back to the deterministic local scorer when the model cannot be reached
+            if not resume_stats["text"]:
+                raise
+            st.warning(f"AI analysis failed ({e}); showing the local ATS score instead.")
+            st.session_state.analysis = local_analysis(resume_stats["text"], input_text)
+        streaming.empty()
+        st.session_state.analysis_key = session_key
+    return st.session_state.analysis
 
 if submit1:
     if st.session_state.resume is not None:
-        pdf_content = input_pdf_setup(st.session_state.resume)
-        response = get_gemini_response(input_prompt1, pdf_content, input_text)
+        response = get_analysis()
         st.subheader("The Response is")
-        st.write(response)
+        st.write(response["evaluation"])
     else:
         st.write("Please upload the resume")
 
 elif submit2:
     if st.session_state.resume is not None:
-        pdf_content = input_pdf_setup(st.session_state.resume)
-        response = get_gemini_response_keywords(input_prompt2, pdf_content, input_text)
+        # Keywords depend only on the job description, so this reuses the shared JD profile
+        response = get_jd_profile(input_text)
         st.subheader("Skills are:")
         if response is not None:
             st.write(f"Technical Skills: {', '.join(response['Technical Skills'])}.")
@@ -111,9 +112,14 @@ elif submit2:
 
 elif submit3:
     if st.session_state.resume is not None:
-        pdf_content = input_pdf_setup(st.session_state.resume)
-        response = get_gemini_response(input_prompt3, pdf_content, input_text)
+        response = get_analysis()["match"]
         st.subheader("The Response is")
-        st.write(response)
+        st.write(f"**Match:** {response['percentage']}%")
+        st.write(f"**Keywords missing:** {', '.join(response['missing_keywords']) or 'None'}")
+        st.write(f"**Final thoughts:** {response['final_thoughts']}")
     else:
         st.write("Please upload the resume")
+
+with st.sidebar.expander("Model call metrics"):
+    # Per-process totals since the server started
+    st.dataframe(llm_gateway.metrics_rows(), hide_index=True)
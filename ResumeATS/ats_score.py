@@ -0,0 +1,137 @@
+import re
+from collections import Counter
+
+import numpy as np
+
+# Deterministic local ATS scoring: no model call, milliseconds per resume
+
+# Multi-word and symbol-heavy skills are matched as phrases; single words are picked up from the JD itself
+SKILL_PHRASES = [
+    "machine learning", "deep learning", "data science", "data analysis", "data structures", "computer vision",
+    "natural language processing", "project management", "problem solving", "rest api", "rest apis",
+    "unit testing", "version control", "object oriented programming", "system design", "cloud computing",
+    "power bi", "spring boot", "react native", "ci/cd", "c++", "c#", "asp.net", "node.js", "next.js", "vue.js",
+    "scikit-learn", "team work", "teamwork", "communication skills", "time management", "critical thinking",
+    "sql server", "google cloud", "microsoft azure", "amazon web services", "large language models",
+]
+# Single-word skills recognised when building a candidate's skill list
+SKILL_TERMS = set("""
+python java javascript typescript go golang rust kotlin swift scala ruby php perl matlab r sql mysql postgresql
+mongodb redis sqlite oracle html css sass react angular vue django flask fastapi express spring hibernate pandas
+numpy tensorflow pytorch keras opencv nlp tableau excel hadoop spark kafka airflow docker kubernetes terraform
+ansible jenkins git github gitlab linux bash aws azure gcp firebase graphql microservices agile scrum jira figma
+android ios flutter dart unity selenium junit pytest blockchain solidity leadership communication teamwork
+""".split())
+STOPWORDS = set("""
+a about above after again all also am an and any are as at be been being below between both but by can could
+did do does doing down during each etc few for from further had has have having he her here hers him his how i
+if in into is it its itself just knowledge least like ll make may me more most must my need needs no nor not
+of off on once only or other our ours out over own per plus preferred required requirements responsibilities
+role same she should so some strong such than that the their them then there these they this those through to
+too under until up us using very was we well were what when where which while who whom why will with within
+work working would years year experience you your yours ability able good excellent candidate candidates team
+job position looking developer engineer skills skill including include includes etc. e.g. i.e. various across ensure understanding
+""".split())
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+MAX_PHRASE_WORDS = max(len(phrase.split()) for phrase in SKILL_PHRASES)
+PHRASES = {tuple(phrase.split()) for phrase in SKILL_PHRASES}
+PHRASES_JOINED = {" ".join(phrase) for phrase in PHRASES}
+
+# BM25 parameters and the blend of signals in the final score
+BM25_K1 = 1.5
+BM25_B = 0.75
+WEIGHTS = {"coverage": 0.5, "cosine": 0.3, "bm25": 0.2}
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+def extract_terms(text):
+    """Skill phrases plus non-stopword single terms, with counts."""
+    tokens = tokenize(text)
+    terms = Counter(token for token in tokens if token not in STOPWORDS and not token.isdigit())
+    for size in range(2, MAX_PHRASE_WORDS + 1):
+        for i in range(len(tokens) - size + 1):
+            gram = tuple(tokens[i:i + size])
+            if gram in PHRASES:
+                terms[" ".join(gram)] += 1
+    return terms
+
+
+def extract_skills(text):
+    """Known skill phrases and skill words mentioned in text, sorted."""
+    return sorted(term for term in extract_terms(text) if term in PHRASES_JOINED or term in SKILL_TERMS)
+
+
+def build_vocabulary(job_description, max_terms=60):
+    """The JD's skill vocabulary: known phrases first, then its most frequent terms."""
+    terms = extract_terms(job_description)
+    phrases = [term for term in terms if " " in term or term in SKILL_PHRASES]
+    # Words already covered by a matched phrase (e.g. "machine" in "machine learning") are not repeated
+    phrase_words = {word for phrase in phrases for word in phrase.split()}
+    singles = [term for term, _ in terms.most_common() if term not in phrases and term not in phrase_words]
+    return (phrases + singles)[:max_terms]
+
+
+def _count_matrix(texts, vocabulary):
+    """Documents x vocabulary term counts plus document lengths."""
+    index = {term: i for i, term in enumerate(vocabulary)}
+    counts = np.zeros((len(texts), len(vocabulary)))
+    lengths = np.zeros(len(texts))
+    for row, text in enumerate(texts):
+        terms = extract_terms(text)
+        lengths[row] = max(sum(terms.values()), 1)
+        for term, count in terms.items():
+            if term in index:
+                counts[row, index[term]] = count
+    return counts, lengths
+
+
+def score_resumes(resume_texts, job_description, vocabulary=None):
+    """Score many resumes against one JD at once; IDF comes from the batch itself.
+
+    A single resume gets unit IDF, so its score does not depend on which terms it happens to contain.
+    Returns one dict per resume with a 0-100 score, the component signals and missing keywords.
+    """
+    vocabulary = vocabulary or build_vocabulary(job_description)
+    if not vocabulary or not resume_texts:
+        return [{"score": 0.0, "coverage": 0.0, "cosine": 0.0, "bm25": 0.0, "missing_keywords": list(vocabulary)}
+                for _ in resume_texts]
+    counts, lengths = _count_matrix(resume_texts, vocabulary)
+    jd_counts, _ = _count_matrix([job_description], vocabulary)
+    jd_counts = np.maximum(jd_counts[0], 1.0)
+
+    # Smoothed IDF over the resumes being scored; one resume carries no rarity information
+    if len(resume_texts) > 1:
+        doc_freq = (counts > 0).sum(axis=0)
+        idf = np.log1p((len(resume_texts) - doc_freq + 0.5) / (doc_freq + 0.5)) + 1.0
+    else:
+        idf = np.ones(len(vocabulary))
+
+    present = counts > 0
+    coverage = present.mean(axis=1)
+
+    # TF-IDF cosine between each resume and the JD over the JD vocabulary
+    resume_vectors = (1.0 + np.log1p(counts)) * present * idf
+    jd_vector = (1.0 + np.log1p(jd_counts)) * idf
+    norms = np.linalg.norm(resume_vectors, axis=1) * np.linalg.norm(jd_vector)
+    cosine = np.divide(resume_vectors @ jd_vector, norms, out=np.zeros(len(resume_texts)), where=norms > 0)
+
+    # BM25 with the saturating term frequency scaled to 0-1 per term, IDF-weighted across the vocabulary
+    length_norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / lengths.mean())
+    saturation = counts * (BM25_K1 + 1) / (counts + length_norm[:, None]) / (BM25_K1 + 1)
+    bm25 = saturation @ idf / idf.sum()
+
+    scores = 100 * (WEIGHTS["coverage"] * coverage + WEIGHTS["cosine"] * cosine + WEIGHTS["bm25"] * bm25)
+    vocabulary = np.array(vocabulary, dtype=object)
+    return [
+        {"score": round(float(scores[i]), 1), "coverage": float(coverage[i]), "cosine": float(cosine[i]),
+         "bm25": float(bm25[i]), "missing_keywords": list(vocabulary[~present[i]])}
+        for i in range(len(resume_texts))
+    ]
+
+
+def score_resume(resume_text, job_description):
+    """Score a single resume against a JD."""
+    return score_resumes([resume_text], job_description)[0]
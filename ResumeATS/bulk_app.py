@@ -0,0 +1,86 @@
+import io
+import csv
+import zipfile
+import streamlit as st
+from bulk_screen import local_prescores, screen_resumes, store_result, CSV_FIELDS, DEFAULT_WORKERS, DEFAULT_REQUESTS_PER_MINUTE
+import llm_gateway  # on sys.path via bulk_screen -> analysis
+
+llm_gateway.configure_logging()
+
+st.set_page_config(page_title="Bulk Resume Screening", layout="wide")
+st.header("Bulk Resume Screening")
+
+job_description = st.text_area("Job Description: ")
+uploads = st.file_uploader("Upload resumes (PDFs or a zip of PDFs)", type=["pdf", "zip"], accept_multiple_files=True)
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    backend = st.selectbox("Model", options=["gemini", "stub"])
+with col2:
+    workers = st.number_input("Concurrent requests", min_value=1, max_value=32, value=DEFAULT_WORKERS)
+with col3:
+    requests_per_minute = st.number_input("Requests per minute", min_value=1, max_value=1000,
+                                          value=DEFAULT_REQUESTS_PER_MINUTE)
+min_local_score = st.slider("Skip the model below this local ATS score (0 = never skip)", 0, 100, 0)
+save_to_mongo = st.checkbox("Also store results in MongoDB")
+
+# Rows finished so far survive reruns, so an interrupted run continues where it stopped;
+# they are only reused for the same job description
+if "screening_rows" not in st.session_state or st.session_state.get("screening_jd") != job_description:
+    st.session_state.screening_rows = {}
+    st.session_state.screening_jd = job_description
+
+
+def iter_uploads(files):
+    for upload in files:
+        if upload.name.lower().endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(upload.getvalue())) as archive:
+                for name in sorted(archive.namelist()):
+                    if name.lower().endswith(".pdf") and not name.startswith("__MACOSX/"):
+                        yield name.rsplit("/", 1)[-1], archive.read(name)
+        else:
+            yield upload.name, upload.getvalue()
+
+
+def show_results(placeholder):
+    rows = sorted(st.session_state.screening_rows.values(),
+                  key=lambda row: row["match_percentage"] if row["match_percentage"] is not None else -1,
+                  reverse=True)
+    placeholder.dataframe(rows, hide_index=True, use_container_width=True)
+
+
+results_placeholder = st.empty()
+
+if st.button("Start Screening"):
+    if not job_description or not uploads:
+        st.write("Please provide a job description and resumes")
+    else:
+        done_ids = {rid for rid, row in st.session_state.screening_rows.items() if not row["error"]}
+        progress = st.empty()
+        progress.write("Scoring text layers locally...")
+        local_scores = local_prescores(iter_uploads(uploads), job_description, skip_ids=done_ids,
+                                       workers=int(workers))
+        for count, row in enumerate(screen_resumes(iter_uploads(uploads), job_description, backend, int(workers),
+                                                   int(requests_per_minute), done_ids,
+                                                   min_local_score or None, local_scores), 1):
+            st.session_state.screening_rows[row["resume_id"]] = row
+            if save_to_mongo:
+                store_result(row, job_description)
+            progress.write(f"Screened {count} resumes...")
+            show_results(results_placeholder)
+        progress.write(f"Screening finished: {len(st.session_state.screening_rows)} resumes")
+
+if st.session_state.screening_rows:
+    show_results(results_placeholder)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    writer.writerows(st.session_state.screening_rows.values())
+    st.download_button("Download CSV", buffer.getvalue(), file_name="screening_results.csv", mime="text/csv")
+    if st.button("Clear Results"):
+        st.session_state.screening_rows = {}
+        st.rerun()
+
+with st.sidebar.expander("Model call metrics"):
+    # Per-process totals since the server started
+    st.dataframe(llm_gateway.metrics_rows(), hide_index=True)
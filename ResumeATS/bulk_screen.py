@@ -0,0 +1,246 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from analysis import analyze_resume, get_jd_profile
+import llm_gateway  # on sys.path via analysis
+from ats_score import build_vocabulary, score_resumes
+from llm_cache import content_hash, db
+from resume_input import extract_text_layer, prepare_resume
+
+# Bulk screening: rank many resumes against one job description
+DEFAULT_WORKERS = 8
+DEFAULT_REQUESTS_PER_MINUTE = 60
+CSV_FIELDS = ["resume_id", "file_name", "match_percentage", "local_score", "scored_by", "missing_keywords",
+              "input_path", "seconds", "error"]
+
+logger = logging.getLogger(__name__)
+
+screening_results = db['screening_results']
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing calls evenly at requests_per_minute."""
+
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def iter_resume_files(source):
+    """Yield (file name, PDF bytes) from a folder or a zip archive of PDFs."""
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for name in sorted(archive.namelist()):
+                if name.lower().endswith(".pdf") and not name.startswith("__MACOSX/"):
+                    yield os.path.basename(name), archive.read(name)
+    else:
+        for name in sorted(os.listdir(source)):
+            if name.lower().endswith(".pdf"):
+                with open(os.path.join(source, name), "rb") as f:
+                    yield name, f.read()
+
+
+def compact_results(csv_path):
+    """Rewrite the CSV with one row per resume_id, the last one written (a re-screen replaces an error row)."""
+    if not os.path.exists(csv_path):
+        return
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = {row["resume_id"]: row for row in csv.DictReader(f)}
+    temp_path = f"{csv_path}.tmp"
+    with open(temp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows.values())
+    os.replace(temp_path, csv_path)
+
+
+def load_completed_ids(csv_path):
+    """Resume ids already written to the CSV, so an interrupted run can pick up where it stopped."""
+    if not os.path.exists(csv_path):
+        return set()
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return {row["resume_id"] for row in csv.DictReader(f) if not row.get("error")}
+
+
+def local_prescores(resume_files, job_description, vocabulary=None, skip_ids=(), workers=DEFAULT_WORKERS):
+    """Local ATS scores for every resume with a text layer, scored as one batch so IDF spans all of them.
+
+    Text layers are extracted in parallel and resumes in skip_ids are not read. Returns
+    {resume_id: score dict}, each also carrying the extracted "text" so screen_one does not extract it again.
+    """
+    skip_ids = set(skip_ids)
+    ids, texts = [], []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        chunk = []
+
+        def drain():
+            for resume_id, text in zip([resume_id for resume_id, _ in chunk],
+                                       pool.map(extract_text_layer, [pdf_bytes for _, pdf_bytes in chunk])):
+                if text:
+                    ids.append(resume_id)
+                    texts.append(text)
+            chunk.clear()
+
+        for _, pdf_bytes in resume_files:
+            resume_id = content_hash(pdf_bytes)
+            if resume_id in skip_ids:
+                continue
+            chunk.append((resume_id, pdf_bytes))
+            # Only a window of PDFs is held at once; the texts are kept for scoring
+            if len(chunk) >= 2 * workers:
+                drain()
+        drain()
+    return {resume_id: {**score, "text": text}
+            for resume_id, text, score in zip(ids, texts, score_resumes(texts, job_description, vocabulary))}
+
+
+def screen_one(file_name, pdf_bytes, job_description, backend, limiter, vocabulary, min_local_score=None,
+               local_scores=None):
+    """Prepare and analyze one resume, returning a result row (errors are recorded, not raised).
+
+    Resumes with a text layer are pre-scored locally (from local_scores when the batch was pre-scored);
+    those below min_local_score skip the model, and the local score stands in when the model call fails.
+    """
+    started = time.perf_counter()
+    row = {"resume_id": content_hash(pdf_bytes), "file_name": file_name, "match_percentage": None,
+           "local_score": None, "scored_by": "", "missing_keywords": "", "input_path": "", "seconds": 0.0,
+           "error": ""}
+    local = None
+    prescored = (local_scores or {}).get(row["resume_id"])
+    try:
+        pdf_content, stats = prepare_resume(pdf_bytes, text=prescored["text"] if prescored else None)
+        row["input_path"] = stats["path"]
+        if stats["text"]:
+            local = prescored or score_resumes([stats["text"]], job_description, vocabulary)[0]
+            row["local_score"] = local["score"]
+        if local is not None and min_local_score is not None and local["score"] < min_local_score:
+            row["match_percentage"] = round(local["score"])
+            row["scored_by"] = "local-prefilter"
+            row["missing_keywords"] = ", ".join(local["missing_keywords"])
+        else:
+            if backend != "stub":
+                limiter.wait()
+            result = analyze_resume(pdf_content, job_description,
+                                    content_hash(json.dumps(pdf_content, sort_keys=True)), backend=backend)
+            row["match_percentage"] = result["match"]["percentage"]
+            row["scored_by"] = backend
+            row["missing_keywords"] = ", ".join(result["match"]["missing_keywords"])
+    except Exception as e:
+        logger.exception("Screening failed for %s", file_name)
+        if local is not None:
+            row["match_percentage"] = round(local["score"])
+            row["scored_by"] = "local-fallback"
+            row["missing_keywords"] = ", ".join(local["missing_keywords"])
+        else:
+            row["error"] = str(e) or type(e).__name__
+    row["seconds"] = round(time.perf_counter() - started, 3)
+    return row
+
+
+def screen_resumes(resume_files, job_description, backend="gemini", workers=DEFAULT_WORKERS,
+                   requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, skip_ids=(), min_local_score=None,
+                   local_scores=None):
+    """Screen resumes concurrently, yielding each result row as soon as it completes.
+
+    At most 2 * workers resumes are held in memory at a time; ids in skip_ids are not reprocessed.
+    local_scores comes from local_prescores over the same resumes.
+    """
+    limiter = RateLimiter(requests_per_minute)
+    vocabulary = build_vocabulary(job_description)
+    # Extract the JD skill profile once up front instead of racing to do it in every worker
+    try:
+        get_jd_profile(job_description, backend)
+    except Exception:
+        logger.exception("JD profile extraction failed; workers will retry it")
+    skip_ids = set(skip_ids)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for file_name, pdf_bytes in resume_files:
+            if content_hash(pdf_bytes) in skip_ids:
+                continue
+            pending.add(pool.submit(screen_one, file_name, pdf_bytes, job_description, backend, limiter,
+                                     vocabulary, min_local_score, local_scores))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def store_result(row, job_description):
+    """Upsert a result row into MongoDB, keyed by resume and JD."""
+    jd_hash = content_hash(" ".join(job_description.lower().split()))
+    screening_results.replace_one({"_id": f"{jd_hash}:{row['resume_id']}"}, {**row, "jd_hash": jd_hash}, upsert=True)
+
+
+def run_bulk_screening(source, job_description, csv_path, backend="gemini", workers=DEFAULT_WORKERS,
+                       requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE, to_mongo=False, min_local_score=None):
+    """Screen every PDF in source, appending rows to csv_path (and MongoDB) as they finish.
+
+    Resumes whose earlier row was an error are screened again; the CSV is compacted afterwards
+    (even when interrupted) so it keeps one row per resume.
+    """
+    compact_results(csv_path)
+    completed = load_completed_ids(csv_path)
+    # A parallel first pass over the text layers, so local scores share one IDF across the resumes to screen
+    local_scores = local_prescores(iter_resume_files(source), job_description, skip_ids=completed, workers=workers)
+    write_header = not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0
+    count = 0
+    try:
+        with open(csv_path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+            if write_header:
+                writer.writeheader()
+            for row in screen_resumes(iter_resume_files(source), job_description, backend, workers,
+                                      requests_per_minute, completed, min_local_score, local_scores):
+                writer.writerow(row)
+                f.flush()
+                if to_mongo:
+                    store_result(row, job_description)
+                count += 1
+                print(f"[{count}] {row['file_name']}: {row['match_percentage'] if not row['error'] else 'ERROR ' + row['error']}")
+    finally:
+        compact_results(csv_path)
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Screen a folder or zip of resumes against one job description")
+    parser.add_argument("source", help="folder or .zip containing PDF resumes")
+    parser.add_argument("--jd", required=True, help="job description text file")
+    parser.add_argument("--out", default="screening_results.csv", help="CSV file to append results to")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--rpm", type=int, default=DEFAULT_REQUESTS_PER_MINUTE, help="model requests per minute")
+    parser.add_argument("--backend", choices=["gemini", "stub"], default="gemini")
+    parser.add_argument("--mongo", action="store_true", help="also store results in MongoDB")
+    parser.add_argument("--min-local-score", type=float, default=None,
+                        help="skip the model for resumes whose local ATS score is below this (0-100)")
+    args = parser.parse_args()
+    llm_gateway.configure_logging()
+    with open(args.jd, encoding="utf-8") as jd_file:
+        jd_text = jd_file.read()
+    processed = run_bulk_screening(args.source, jd_text, args.out, args.backend, args.workers, args.rpm, args.mongo,
+                                   args.min_local_score)
+    print(f"Screened {processed} resumes into {args.out}")
+    for row in llm_gateway.metrics_rows():
+        print(f"{row['label']}: {row['calls']} calls, {row['errors']} errors, {row['retries']} retries, "
+              f"avg ttft {row['avg_ttft_s']}s, avg latency {row['avg_latency_s']}s")
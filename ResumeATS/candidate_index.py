@@ -0,0 +1,263 @@
+import argparse
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from pymongo import ASCENDING, UpdateOne
+
+from ats_score import PHRASES_JOINED, STOPWORDS, extract_skills, extract_terms, tokenize
+from llm_cache import client, content_hash, db
+
+# Candidate search for companies: parsed resumes per student plus an in-memory inverted index over them
+BM25_K1 = 1.2
+BM25_B = 0.75
+REBUILD_SECONDS = 600  # full rebuild picks up deleted candidates and profile (college/department) changes
+DEFAULT_LIMIT = 50
+QUERY_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+
+candidates = db['candidates']
+students = client['studentDB']['students']
+
+
+def ensure_indexes():
+    candidates.create_index([("updated_at", ASCENDING)])
+    candidates.create_index([("skills", ASCENDING)])
+    candidates.create_index([("college", ASCENDING), ("department", ASCENDING)])
+
+
+def student_profile(username):
+    return students.find_one({"username": username}, {"_id": 0, "name": 1, "college": 1, "department": 1}) or {}
+
+
+def index_resume(username, resume_text, resume_hash=None):
+    """Store a student's parsed resume; returns False if the same resume was already indexed."""
+    resume_hash = resume_hash or content_hash(resume_text)
+    existing = candidates.find_one({"_id": username}, {"resume_hash": 1})
+    if existing and existing.get("resume_hash") == resume_hash:
+        return False
+    terms = extract_terms(resume_text)
+    profile = student_profile(username)
+    candidates.replace_one({"_id": username}, {
+        "resume_hash": resume_hash,
+        "text": resume_text,
+        "skills": extract_skills(resume_text),
+        # Terms such as "node.js" are not valid Mongo keys, so counts are stored as pairs
+        "term_counts": [[term, count] for term, count in terms.items()],
+        "length": max(sum(terms.values()), 1),
+        "name": profile.get("name", ""),
+        "college": profile.get("college", ""),
+        "department": profile.get("department", ""),
+        "updated_at": datetime.utcnow(),
+    }, upsert=True)
+    return True
+
+
+def sync_profiles():
+    """Copy current college/department/name from the students collection onto indexed candidates."""
+    usernames = candidates.distinct("_id")
+    now = datetime.utcnow()
+    updates = [UpdateOne({"_id": p["username"]},
+                         {"$set": {"name": p.get("name", ""), "college": p.get("college", ""),
+                                   "department": p.get("department", ""), "updated_at": now}})
+               for p in students.find({"username": {"$in": usernames}},
+                                      {"_id": 0, "username": 1, "name": 1, "college": 1, "department": 1})]
+    if updates:
+        candidates.bulk_write(updates, ordered=False)
+    return len(updates)
+
+
+def _literal_terms(literal):
+    """Index terms a query literal must match: a known skill phrase, or every word of it."""
+    literal = literal.lower().strip()
+    if literal in PHRASES_JOINED:
+        return [literal]
+    return [token for token in tokenize(literal) if token not in STOPWORDS]
+
+
+def parse_boolean_query(query):
+    """Parse 'a b OR "c d" NOT e' into OR-ed clauses of (required terms, excluded terms).
+
+    Adjacent literals are AND-ed, OR separates clauses and NOT (or a leading '-') excludes a literal.
+    """
+    clauses = [([], [])]
+    negate = False
+    for phrase, word in QUERY_PATTERN.findall(query):
+        literal = phrase or word
+        if not phrase and literal == "OR":
+            clauses.append(([], []))
+            continue
+        if not phrase and literal in ("AND", "NOT"):
+            negate = negate or literal == "NOT"
+            continue
+        if not phrase and literal.startswith("-") and len(literal) > 1:
+            literal, negate = literal[1:], True
+        terms = _literal_terms(literal)
+        clauses[-1][1 if negate else 0].extend(terms)
+        negate = False
+    return [clause for clause in clauses if clause[0]]
+
+
+class CandidateIndex:
+    """Inverted index of resume terms with BM25 ranking, boolean queries and college/department filters.
+
+    refresh() pulls only candidates updated since the last call, so uploads show up without a rebuild.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.postings = {}  # term -> {username: term frequency}
+        self.doc_terms = {}  # username -> {term: frequency}, to undo postings on re-index
+        self.lengths = {}
+        self.total_length = 0
+        self.meta = {}  # username -> {name, college, department, skills}
+        self.watermark = None
+        self.built_at = 0.0
+
+    def _remove(self, username):
+        for term in self.doc_terms.pop(username, {}):
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(username, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_length -= self.lengths.pop(username, 0)
+        self.meta.pop(username, None)
+
+    def _add(self, doc):
+        username = doc["_id"]
+        self._remove(username)
+        terms = {term: count for term, count in doc["term_counts"]}
+        for term, count in terms.items():
+            self.postings.setdefault(term, {})[username] = count
+        self.doc_terms[username] = terms
+        self.lengths[username] = doc["length"]
+        self.total_length += doc["length"]
+        self.meta[username] = {"name": doc.get("name", ""), "college": doc.get("college", ""),
+                               "department": doc.get("department", ""), "skills": doc.get("skills", [])}
+
+    def refresh(self, force_rebuild=False):
+        """Apply candidates changed since the last refresh (or rebuild everything periodically)."""
+        projection = {"text": 0}
+        with self.lock:
+            if force_rebuild or time.monotonic() - self.built_at > REBUILD_SECONDS:
+                self._reset()
+                self.built_at = time.monotonic()
+                query = {}
+            else:
+                # $gte so writes sharing the last timestamp are not missed; re-adding a candidate is idempotent
+                query = {"updated_at": {"$gte": self.watermark}} if self.watermark else {}
+            changed = 0
+            for doc in candidates.find(query, projection).sort("updated_at", ASCENDING):
+                self._add(doc)
+                self.watermark = doc["updated_at"]
+                changed += 1
+            return changed
+
+    def _bm25(self, terms, usernames):
+        """BM25 scores for usernames over the query terms."""
+        total_docs = len(self.lengths)
+        average_length = self.total_length / total_docs if total_docs else 1.0
+        scores = Counter()
+        for term in set(terms):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (total_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for username, tf in docs.items():
+                if usernames is None or username in usernames:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[username] / average_length)
+                    scores[username] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    def _boolean_matches(self, clauses):
+        matches = set()
+        for required, excluded in clauses:
+            # Intersect starting from the rarest term so the working set stays small
+            postings = sorted((self.postings.get(term, {}) for term in required), key=len)
+            clause = set(postings[0]) if postings else set()
+            for docs in postings[1:]:
+                clause.intersection_update(docs)
+            for term in excluded:
+                clause.difference_update(self.postings.get(term, ()))
+            matches |= clause
+        return matches
+
+    def search(self, query, mode="ranked", college=None, department=None, limit=DEFAULT_LIMIT):
+        """Return [(username, score, meta)] best first.
+
+        mode "ranked" scores any candidate matching some query term with BM25; "boolean" keeps only
+        candidates satisfying the boolean query and ranks them by BM25 over its required terms.
+        """
+        with self.lock:
+            if mode == "boolean":
+                clauses = parse_boolean_query(query)
+                allowed = self._boolean_matches(clauses)
+                terms = [term for required, _ in clauses for term in required]
+            else:
+                allowed = None
+                terms = [term for phrase, word in QUERY_PATTERN.findall(query) for term in _literal_terms(phrase or word)]
+            if college or department:
+                filtered = {username for username, meta in self.meta.items()
+                            if (not college or meta["college"] == college)
+                            and (not department or meta["department"] == department)}
+                allowed = filtered if allowed is None else allowed & filtered
+            scores = self._bm25(terms, allowed)
+            if mode == "boolean":
+                for username in allowed:
+                    scores.setdefault(username, 0.0)
+            return [(username, round(score, 3), self.meta[username]) for username, score in scores.most_common(limit)]
+
+
+def index_folder(folder):
+    """Index every <username>.pdf (or .txt) in folder; returns how many resumes changed."""
+    from resume_input import extract_text_layer
+    changed = 0
+    for name in sorted(os.listdir(folder)):
+        username, ext = os.path.splitext(name)
+        path = os.path.join(folder, name)
+        if ext.lower() == ".pdf":
+            with open(path, "rb") as f:
+                pdf_bytes = f.read()
+            text, resume_hash = extract_text_layer(pdf_bytes), content_hash(pdf_bytes)
+        elif ext.lower() == ".txt":
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            resume_hash = content_hash(text)
+        else:
+            continue
+        if not text.strip():
+            print(f"Skipping {name}: no text layer")
+            continue
+        changed += index_resume(username, text, resume_hash)
+    return changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain and query the candidate search index")
+    parser.add_argument("--index-folder", help="index every <username>.pdf/.txt resume in this folder")
+    parser.add_argument("--sync-profiles", action="store_true", help="refresh college/department from studentDB")
+    parser.add_argument("--search", help="query to run against the index")
+    parser.add_argument("--mode", choices=["ranked", "boolean"], default="ranked")
+    parser.add_argument("--college")
+    parser.add_argument("--department")
+    args = parser.parse_args()
+    ensure_indexes()
+    if args.index_folder:
+        print(f"Indexed {index_folder(args.index_folder)} new or changed resumes")
+    if args.sync_profiles:
+        print(f"Synced {sync_profiles()} candidate profiles")
+    if args.search:
+        index = CandidateIndex()
+        index.refresh()
+        started = time.perf_counter()
+        results = index.search(args.search, args.mode, args.college, args.department)
+        print(f"{len(results)} results in {(time.perf_counter() - started) * 1000:.1f} ms")
+        for username, score, meta in results:
+            print(f"{score:8.3f}  {username}  {meta['college']} / {meta['department']}  {', '.join(meta['skills'][:10])}")
@@ -0,0 +1,60 @@
+import time
+import streamlit as st
+from candidate_index import CandidateIndex, ensure_indexes, students
+from portal_auth import verify_login
+
+st.set_page_config(page_title="Candidate Search", layout="wide")
+st.header("🔎 Candidate Search")
+
+# Student profiles are only shown to signed-in companies
+if "company" not in st.session_state:
+    with st.form("company_login"):
+        company_username = st.text_input("Company username")
+        company_password = st.text_input("Password", type="password")
+        if st.form_submit_button("Sign in"):
+            if verify_login("company", company_username, company_password):
+                st.session_state.company = company_username
+                st.rerun()
+            st.error("Invalid username or password")
+    st.stop()
+
+if st.sidebar.button(f"Sign out ({st.session_state.company})"):
+    del st.session_state["company"]
+    st.rerun()
+
+@st.cache_resource
+def get_index():
+    # One index per server process, shared by every company session
+    ensure_indexes()
+    return CandidateIndex()
+
+@st.cache_data(ttl=300)
+def get_scopes():
+    return sorted(c for c in students.distinct("college") if c), sorted(d for d in students.distinct("department") if d)
+
+index = get_index()
+# Picks up only resumes uploaded since the previous query
+index.refresh()
+
+colleges, departments = get_scopes()
+query = st.text_input("Skills or keywords", placeholder='python "machine learning" OR java NOT spring')
+col1, col2, col3 = st.columns([2, 2, 1])
+with col1:
+    college = st.selectbox("College", options=[""] + colleges)
+with col2:
+    department = st.selectbox("Department", options=[""] + departments)
+with col3:
+    mode = st.radio("Match", options=["ranked", "boolean"],
+                    format_func={"ranked": "Best match", "boolean": "Exact (AND/OR/NOT)"}.get)
+
+if query:
+    started = time.perf_counter()
+    results = index.search(query, mode, college or None, department or None)
+    st.caption(f"{len(results)} candidates in {(time.perf_counter() - started) * 1000:.1f} ms "
+               f"(searching {len(index.lengths)} resumes)")
+    if results:
+        st.dataframe([{"Username": username, "Name": meta["name"], "College": meta["college"],
+                       "Department": meta["department"], "Score": score, "Skills": ", ".join(meta["skills"])}
+                      for username, score, meta in results], hide_index=True, use_container_width=True)
+    else:
+        st.write("No candidates match this search")
@@ -0,0 +1,83 @@
+import os
+import hashlib
+import logging
+from datetime import datetime, timedelta
+
+from pymongo import MongoClient, ASCENDING
+from pymongo.errors import PyMongoError
+
+# Shared response cache: every Streamlit worker (and the batch tools) read and write the same collection
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
+CACHE_TTL = timedelta(days=7)
+MAX_ENTRIES = 20000  # oldest-used entries are evicted beyond this
+
+logger = logging.getLogger(__name__)
+
+client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=2000)
+db = client['resume_ats']
+responses = db['llm_cache']
+
+_indexes_ready = False
+
+
+def content_hash(data):
+    """SHA-256 of bytes or text."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def normalize_jd(text):
+    """Normalize a job description so trivial whitespace/case edits share a cache entry."""
+    return " ".join((text or "").lower().split())
+
+
+def cache_key(prompt_id, resume_hash, jd_hash, model):
+    return content_hash("|".join([prompt_id, resume_hash, jd_hash, model]))
+
+
+def _ensure_indexes():
+    global _indexes_ready
+    if not _indexes_ready:
+        responses.create_index("expires_at", expireAfterSeconds=0)
+        responses.create_index([("last_used", ASCENDING)])
+        _indexes_ready = True
+
+
+def get_cached(key):
+    """Return the cached value for key, or None on a miss (or if the cache is unreachable)."""
+    try:
+        entry = responses.find_one_and_update({"_id": key, "expires_at": {"$gt": datetime.utcnow()}},
+                                              {"$set": {"last_used": datetime.utcnow()}},
+                                              projection={"value": 1})
+    except PyMongoError as e:
+        logger.warning("LLM cache read failed: %s", e)
+        return None
+    return entry["value"] if entry else None
+
+
+def put_cached(key, value, ttl=CACHE_TTL):
+    """Store value under key and evict least recently used entries beyond MAX_ENTRIES."""
+    now = datetime.utcnow()
+    try:
+        _ensure_indexes()
+        responses.replace_one({"_id": key},
+                              {"value": value, "created_at": now, "last_used": now, "expires_at": now + ttl},
+                              upsert=True)
+        excess = responses.estimated_document_count() - MAX_ENTRIES
+        if excess > 0:
+            stale = [entry["_id"] for entry in
+                     responses.find({}, {"_id": 1}).sort("last_used", ASCENDING).limit(excess)]
+            responses.delete_many({"_id": {"$in": stale}})
+    except PyMongoError as e:
+        logger.warning("LLM cache write failed: %s", e)
+
+
+def cached_call(prompt_id, resume_hash, jd_text, model, compute, ttl=CACHE_TTL):
+    """Return the cached result for (prompt id, resume, normalized JD, model), computing it on a miss."""
+    key = cache_key(prompt_id, resume_hash, content_hash(normalize_jd(jd_text)), model)
+    value = get_cached(key)
+    if value is None:
+        value = compute()
+        put_cached(key, value, ttl)
+    return value
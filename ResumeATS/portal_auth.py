@@ -0,0 +1,21 @@
+import bcrypt
+
+from llm_cache import client
+
+# Credentials are the portal's own accounts (server.js stores bcrypt hashes in studentDB)
+portal_db = client['studentDB']
+ACCOUNTS = {"student": portal_db['students'], "company": portal_db['companies']}
+
+
+def verify_login(kind, username, password):
+    """True if username/password match a portal account of this kind ("student" or "company")."""
+    if not username or not password:
+        return False
+    account = ACCOUNTS[kind].find_one({"username": username}, {"password": 1})
+    if not account or not account.get("password"):
+        return False
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), account["password"].encode("utf-8"))
+    except ValueError:
+        # Not a bcrypt hash
+        return False
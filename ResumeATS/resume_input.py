@@ -0,0 +1,148 @@
+import io
+import re
+import base64
+import logging
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pdf2image
+from PIL import Image
+
+# Rendering defaults: enough resolution for the model to read a resume without
+# paying for poppler's full-size output
+RENDER_DPI = 150
+MAX_PAGE_HEIGHT = 1800  # pixels; pages taller than this at the chosen DPI are scaled down, width follows
+MAX_PARALLEL_PAGES = 4
+
+# Text layer extraction: a digital resume yields plenty of readable characters,
+# a scanned one yields little or nothing and falls back to images
+MIN_TEXT_CHARS = 300
+MIN_ALNUM_RATIO = 0.5
+PDFTOTEXT_TIMEOUT = 15
+
+PAGE_SIZE_PATTERN = re.compile(r"([\d.]+) x ([\d.]+) pts")
+
+logger = logging.getLogger(__name__)
+
+# How resume pages are sent to the model
+PAGE_MODES = {
+    "single": "First page only",
+    "multi": "All pages",
+    "stitched": "All pages (stitched)",
+}
+
+
+def _to_jpeg_bytes(image):
+    img_byte_arr = io.BytesIO()
+    image.convert("RGB").save(img_byte_arr, format='JPEG')
+    return img_byte_arr.getvalue()
+
+
+def _render_page(job):
+    """Render one page to JPEG bytes; runs in a worker process."""
+    pdf_bytes, page, dpi, size = job
+    images = pdf2image.convert_from_bytes(pdf_bytes, dpi=dpi, size=size, first_page=page, last_page=page)
+    return _to_jpeg_bytes(images[0])
+
+
+def page_size_cap(info, dpi=RENDER_DPI, max_height=MAX_PAGE_HEIGHT):
+    """pdf2image size for a page: None (dpi decides) unless the page would render taller than max_height.
+
+    A size target overrides the DPI in pdftoppm, so it is only passed when the page actually needs shrinking.
+    """
+    match = PAGE_SIZE_PATTERN.search(info.get("Page size", ""))
+    if match is None or max_height is None:
+        return None
+    height_points = float(match.group(2))
+    return (None, max_height) if height_points / 72 * dpi > max_height else None
+
+
+def render_pages(pdf_bytes, pages=None, dpi=RENDER_DPI, max_height=MAX_PAGE_HEIGHT):
+    """Render the given 1-based pages (all pages if None) to JPEG bytes, in parallel when there are several.
+
+    The height cap is decided from the first page's size, which is what pdfinfo reports.
+    """
+    info = pdf2image.pdfinfo_from_bytes(pdf_bytes)
+    if pages is None:
+        pages = range(1, info["Pages"] + 1)
+    size = page_size_cap(info, dpi, max_height)
+    jobs = [(pdf_bytes, page, dpi, size) for page in pages]
+    if len(jobs) == 1:
+        return [_render_page(jobs[0])]
+    with ProcessPoolExecutor(max_workers=min(MAX_PARALLEL_PAGES, len(jobs))) as pool:
+        return list(pool.map(_render_page, jobs))
+
+
+def stitch_vertically(jpeg_pages):
+    """Combine page images into one tall JPEG so the model gets a single image part."""
+    images = [Image.open(io.BytesIO(page)) for page in jpeg_pages]
+    width = max(image.width for image in images)
+    stitched = Image.new("RGB", (width, sum(image.height for image in images)), "white")
+    offset = 0
+    for image in images:
+        stitched.paste(image, (0, offset))
+        offset += image.height
+    return _to_jpeg_bytes(stitched)
+
+
+def pdf_to_image_parts(pdf_bytes, mode="single", dpi=RENDER_DPI, max_height=MAX_PAGE_HEIGHT):
+    """Turn a resume PDF into Gemini image parts according to the page mode."""
+    if mode == "single":
+        jpeg_pages = render_pages(pdf_bytes, pages=[1], dpi=dpi, max_height=max_height)
+    else:
+        jpeg_pages = render_pages(pdf_bytes, dpi=dpi, max_height=max_height)
+        if mode == "stitched":
+            jpeg_pages = [stitch_vertically(jpeg_pages)]
+    return [
+        {
+            "mime_type": "image/jpeg",
+            "data": base64.b64encode(page).decode()
+        }
+        for page in jpeg_pages
+    ]
+
+
+def extract_text_layer(pdf_bytes):
+    """Extract the embedded text with poppler's pdftotext; returns "" when there is none."""
+    try:
+        result = subprocess.run(["pdftotext", "-layout", "-enc", "UTF-8", "-", "-"], input=pdf_bytes, capture_output=True,
+                                timeout=PDFTOTEXT_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+    return result.stdout.decode("utf-8", errors="ignore") if result.returncode == 0 else ""
+
+
+def is_text_usable(text):
+    """Heuristic for a real text layer rather than an empty or garbage one from a scan."""
+    stripped = "".join(text.split())
+    if len(stripped) < MIN_TEXT_CHARS:
+        return False
+    return sum(ch.isalnum() for ch in stripped) / len(stripped) >= MIN_ALNUM_RATIO
+
+
+def prepare_resume(pdf_bytes, mode="single", dpi=RENDER_DPI, max_height=MAX_PAGE_HEIGHT, text=None):
+    """Build the model parts for a resume, preferring its text layer over rendered images.
+
+    text is a text layer already extracted from pdf_bytes, if the caller has one.
+    Returns (parts, stats) where stats records the path taken, time spent, payload size and
+    whatever text layer was found (used for local scoring).
+    """
+    started = time.perf_counter()
+    # Text is cheap to send, so every page is included regardless of the image page mode
+    if text is None:
+        text = extract_text_layer(pdf_bytes)
+    extract_seconds = time.perf_counter() - started
+    if is_text_usable(text):
+        parts = [f"Resume:\n{text}"]
+        stats = {"path": "text", "extract_seconds": extract_seconds, "render_seconds": 0.0,
+                 "payload_bytes": len(parts[0].encode("utf-8")), "text": text}
+    else:
+        render_started = time.perf_counter()
+        parts = pdf_to_image_parts(pdf_bytes, mode=mode, dpi=dpi, max_height=max_height)
+        stats = {"path": "image", "extract_seconds": extract_seconds,
+                 "render_seconds": time.perf_counter() - render_started,
+                 "payload_bytes": sum(len(part["data"]) for part in parts), "text": text}
+    logger.info("Resume prepared via %s path: extract %.3fs, render %.3fs, payload %d bytes",
+                stats["path"], stats["extract_seconds"], stats["render_seconds"], stats["payload_bytes"])
+    return parts, stats
@@ -0,0 +1,257 @@
+import os
+import time
+import random
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+
+# Shared gateway for every model call in the portal's Python apps (ResumeATS, MockInter):
+# one client per model, a per-process in-flight cap, single-flight dedupe of identical requests,
+# retries with backoff inside a deadline, and latency/token metrics. LLM_BACKEND=stub runs offline.
+DEFAULT_MODEL = 'gemini-1.5-flash'
+DEFAULT_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))
+DEFAULT_DEADLINE = float(os.getenv("LLM_DEADLINE_SECONDS", "60"))
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 0.5  # seconds, doubled per retry with jitter
+STUB_LATENCY = float(os.getenv("LLM_STUB_LATENCY", "0"))  # simulated seconds per stub call, for load tests
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+logger = logging.getLogger(__name__)
+
+
+class LLMTimeoutError(TimeoutError):
+    """The call could not complete within its deadline."""
+
+
+class GeminiBackend:
+    """Google Gemini through google-generativeai, reusing one GenerativeModel per model name."""
+
+    def __init__(self):
+        import google.generativeai as genai
+        from google.api_core import exceptions
+        genai.configure(api_key=os.getenv('API_KEY'))
+        self.genai = genai
+        self.models = {}
+        self.lock = threading.Lock()
+        self.retryable = (exceptions.ResourceExhausted, exceptions.ServiceUnavailable, exceptions.DeadlineExceeded,
+                          exceptions.InternalServerError, ConnectionError, TimeoutError)
+
+    def model(self, name):
+        with self.lock:
+            if name not in self.models:
+                self.models[name] = self.genai.GenerativeModel(name)
+            return self.models[name]
+
+    def stream(self, model, contents, timeout, usage, **kwargs):
+        """Yield text pieces; usage is filled with token counts when the backend reports them."""
+        for chunk in self.model(model).generate_content(contents, stream=True,
+                                                        request_options={"timeout": timeout}, **kwargs):
+            metadata = getattr(chunk, "usage_metadata", None)
+            if metadata:
+                usage["prompt_tokens"] = metadata.prompt_token_count
+                usage["output_tokens"] = metadata.candidates_token_count
+            if chunk.parts and chunk.text:
+                yield chunk.text
+
+
+class StubBackend:
+    """Deterministic offline backend for load tests and CI.
+
+    Responders registered per call label build the answer from the request contents; unknown labels get
+    five numbered lines so list-style parsers still work.
+    """
+
+    retryable = ()
+
+    def __init__(self):
+        self.responders = {}
+
+    def respond(self, label, contents):
+        responder = self.responders.get(label)
+        if responder is not None:
+            return responder(contents)
+        return "\n".join(f"{i}. Stub {label} response {i}?" for i in range(1, 6))
+
+    def stream(self, model, contents, timeout, usage, label="", **kwargs):
+        text = self.respond(label, contents)
+        if STUB_LATENCY:
+            time.sleep(min(STUB_LATENCY, timeout))
+        usage["prompt_tokens"] = sum(len(part.split()) for part in contents if isinstance(part, str))
+        usage["output_tokens"] = len(text.split())
+        for start in range(0, len(text), 64):
+            yield text[start:start + 64]
+
+
+_backend_factories = {"gemini": GeminiBackend, "stub": StubBackend}
+_backends = {}
+_backends_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+_metrics = defaultdict(lambda: defaultdict(float))
+_metrics_lock = threading.Lock()
+
+
+def register_backend(name, factory):
+    """Make a backend available by name; factory() must return an object with stream() and retryable."""
+    _backend_factories[name] = factory
+
+
+def get_backend(name=None):
+    """The shared backend instance for name (created on first use)."""
+    name = name or DEFAULT_BACKEND
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = _backend_factories[name]()
+        return _backends[name]
+
+
+def register_stub_responder(label, responder):
+    """Have the stub backend answer calls with this label using responder(contents) -> text."""
+    get_backend("stub").responders[label] = responder
+
+
+def _record(label, **values):
+    with _metrics_lock:
+        for key, value in values.items():
+            _metrics[label][key] += value
+
+
+def metrics():
+    """Snapshot of per-label counters: calls, errors, retries, deduped, latency and token totals."""
+    with _metrics_lock:
+        return {label: dict(values) for label, values in _metrics.items()}
+
+
+def metrics_rows():
+    """metrics() as one table row per label, with average TTFT and latency over successful calls."""
+    rows = []
+    for label, values in sorted(metrics().items()):
+        succeeded = values.get("calls", 0) - values.get("errors", 0)
+        rows.append({
+            "label": label,
+            "calls": int(values.get("calls", 0)),
+            "errors": int(values.get("errors", 0)),
+            "retries": int(values.get("retries", 0)),
+            "deduped": int(values.get("deduped", 0)),
+            "avg_ttft_s": round(values.get("ttft_seconds", 0) / succeeded, 3) if succeeded else None,
+            "avg_latency_s": round(values.get("latency_seconds", 0) / succeeded, 3) if succeeded else None,
+            "output_tokens": int(values.get("output_tokens", 0)),
+        })
+    return rows
+
+
+def configure_logging():
+    """Send per-call timings (INFO) to stderr; entry points call this, it is a no-op once logging is set up."""
+    logging.basicConfig(level=LOG_LEVEL, format=LOG_FORMAT)
+
+
+def request_key(backend, model, label, contents, kwargs):
+    """Hash identifying an identical request, used for single-flight."""
+    digest = hashlib.sha256()
+    for part in [backend, model, label, repr(sorted(kwargs.items()))]:
+        digest.update(part.encode("utf-8"))
+    for part in contents:
+        if isinstance(part, dict):
+            # Image parts carry base64 data as str (see resume_input.pdf_to_image_parts) or raw bytes
+            data = part.get("data", b"")
+            digest.update(part.get("mime_type", "").encode("utf-8"))
+            digest.update(data.encode("utf-8") if isinstance(data, str) else data)
+        else:
+            digest.update(str(part).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.text = None
+        self.error = None
+
+
+def _call(backend_name, model, contents, label, on_text, deadline_at, kwargs):
+    """Run one request with the in-flight cap, retries and deadline; returns the full text."""
+    backend = get_backend(backend_name)
+    if backend_name == "stub":
+        kwargs = {**kwargs, "label": label}
+    started = time.perf_counter()
+    if not _slots.acquire(timeout=max(deadline_at - time.monotonic(), 0)):
+        _record(label, calls=1, errors=1)
+        raise LLMTimeoutError(f"{label}: no free model slot before the deadline")
+    try:
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                break
+            usage, text, first_token = {}, "", None
+            try:
+                for piece in backend.stream(model, contents, remaining, usage, **kwargs):
+                    if first_token is None:
+                        first_token = time.perf_counter() - started
+                    text += piece
+                    if on_text is not None:
+                        on_text(text)
+            except backend.retryable as e:
+                _record(label, retries=1)
+                delay = min(BACKOFF_BASE * 2 ** (attempt - 1) * (1 + random.random()), deadline_at - time.monotonic())
+                logger.warning("%s: attempt %d failed (%s), retrying in %.2fs", label, attempt, e, max(delay, 0))
+                if attempt == MAX_ATTEMPTS or delay <= 0:
+                    _record(label, calls=1, errors=1)
+                    raise
+                time.sleep(delay)
+                continue
+            except Exception:
+                _record(label, calls=1, errors=1)
+                raise
+            total = time.perf_counter() - started
+            _record(label, calls=1, latency_seconds=total, ttft_seconds=first_token or 0.0,
+                    prompt_tokens=usage.get("prompt_tokens", 0), output_tokens=usage.get("output_tokens", 0))
+            logger.info("%s: ttft %.2fs, total %.2fs, %d chars, %s prompt / %s output tokens", label,
+                        first_token if first_token is not None else float("nan"), total, len(text),
+                        usage.get("prompt_tokens", "?"), usage.get("output_tokens", "?"))
+            return text
+        _record(label, calls=1, errors=1)
+        raise LLMTimeoutError(f"{label}: deadline exceeded after {time.perf_counter() - started:.1f}s")
+    finally:
+        _slots.release()
+
+
+def generate(contents, label="gemini", on_text=None, model=DEFAULT_MODEL, backend=None,
+             deadline=DEFAULT_DEADLINE, **kwargs):
+    """Generate text for contents, streaming it to on_text(text so far); returns the full text.
+
+    Identical requests already in flight in this process share one call: followers wait for the
+    leader and receive the full text once.
+    """
+    backend = backend or DEFAULT_BACKEND
+    deadline_at = time.monotonic() + deadline
+    key = request_key(backend, model, label, contents, kwargs)
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+    if not leader:
+        _record(label, deduped=1)
+        if not flight.done.wait(max(deadline_at - time.monotonic(), 0)):
+            raise LLMTimeoutError(f"{label}: deadline exceeded waiting for an identical request")
+        if flight.error is not None:
+            raise flight.error
+        if on_text is not None:
+            on_text(flight.text)
+        return flight.text
+    try:
+        flight.text = _call(backend, model, contents, label, on_text, deadline_at, kwargs)
+        return flight.text
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.done.set()